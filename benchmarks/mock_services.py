@@ -0,0 +1,297 @@
+"""In-process stand-ins for every service API the collectors talk to.
+
+MockServices is an httpx transport: install it with
+``registry.transport_factory = mocks.transport_factory`` and every pooled client
+talks to these handlers instead of the network, with the retry, breaker and cache
+layers still in place. Payload size, latency and error rate are configurable.
+"""
+import json
+import time
+import random
+import asyncio
+from collections import Counter
+from dataclasses import dataclass, field
+from functools import lru_cache
+from typing import Any, Callable, Dict, Tuple
+
+import httpx
+
+DAY = 86400
+
+
+@dataclass
+class Scale:
+    torrents: int = 200
+    queue: int = 50 # Per *arr instance
+    nodes: int = 3 # Proxmox nodes
+    guests_per_node: int = 10
+    storages_per_node: int = 2
+    environments: int = 2 # Portainer
+    transfers: int = 200 # slskd, per direction
+    sessions: int = 20 # Jellyfin
+    indexers: int = 30 # Prowlarr
+    speedtests: int = 400 # Speedtest Tracker results (one every 30 minutes)
+
+
+@dataclass
+class MockServices:
+    scale: Scale = field(default_factory=Scale)
+    latency: float = 0.02 # Mean seconds per request, +/-50% jitter
+    error_rate: float = 0.0 # Share of requests answered with 503
+    seed: int = 1
+    requests: Counter = field(default_factory=Counter) # service -> requests handled
+    bytes_sent: Counter = field(default_factory=Counter)
+
+    def __post_init__(self):
+        self.random = random.Random(self.seed)
+        self.started = time.time()
+        self.routes: Dict[str, Callable[[httpx.Request], Any]] = {
+            "adguard": self.adguard, "bazarr": self.bazarr, "gluetun": self.gluetun,
+            "jellyfin": self.jellyfin, "jellyseerr": self.jellyseerr, "lidarr": self.arr,
+            "portainer": self.portainer, "prowlarr": self.prowlarr, "proxmox": self.proxmox,
+            "qbittorrent": self.qbittorrent, "radarr": self.arr, "slskd": self.slskd,
+            "sonarr": self.arr, "speedtest_tracker": self.speedtest,
+        }
+
+    # Service configs pointing at the mocks, keyed like config.yaml
+    def config(self) -> Dict[str, Any]:
+        def url(kind):
+            return f"http://{kind.replace('_', '-')}.mock"
+        cfg = {
+            "proxmox": {"name": "Proxmox VE", "host": url("proxmox"), "username": "bench@pam!t", "api_token": "t", "rrd": True},
+            "portainer": {"name": "Portainer", "url": url("portainer"), "token": "t"},
+            "gluetun": {"name": "Gluetun VPN", "url": url("gluetun")},
+            "adguard": {"name": "AdGuard Home", "url": url("adguard"), "username": "u", "password": "p"},
+            "speedtest_tracker": {"name": "Speedtest Tracker", "url": url("speedtest_tracker"), "api_key": "k"},
+            "prowlarr": {"name": "Prowlarr", "url": url("prowlarr"), "api_key": "k"},
+            "bazarr": {"name": "Bazarr", "url": url("bazarr"), "api_key": "k"},
+            "qbittorrent": {"name": "qBittorrent", "url": url("qbittorrent"), "username": "u", "password": "p"},
+            "slskd": {"name": "SLSKD", "url": url("slskd"), "api_key": "k"},
+            "jellyfin": {"name": "Jellyfin", "url": url("jellyfin"), "api_key": "k"},
+            "jellyseerr": {"name": "Jellyseerr", "url": url("jellyseerr"), "api_key": "k"},
+        }
+        for kind in ("sonarr", "radarr", "lidarr"):
+            cfg[kind] = {"name": kind.title(), "url": url(kind), "api_key": "k"}
+        return cfg
+
+    def transport_factory(self, base_url: str, verify: bool, limits: httpx.Limits) -> httpx.AsyncBaseTransport:
+        return httpx.MockTransport(self.handle)
+
+    async def handle(self, request: httpx.Request) -> httpx.Response:
+        kind = request.url.host.split(".")[0].replace("-", "_")
+        self.requests[kind] += 1
+        await asyncio.sleep(self.latency * self.random.uniform(0.5, 1.5))
+        if self.random.random() < self.error_rate:
+            return httpx.Response(503, text="Service Unavailable")
+        result = self.routes[kind](request)
+        if isinstance(result, httpx.Response):
+            return result
+        body = result if isinstance(result, bytes) else json.dumps(result).encode()
+        self.bytes_sent[kind] += len(body)
+        return httpx.Response(200, content=body, headers={"content-type": "application/json"})
+
+    # Handlers. Large payloads are built once and served as cached bytes.
+
+    def adguard(self, request):
+        path = request.url.path
+        if path.endswith("/filtering/status"):
+            return {"enabled": True, "filters": []}
+        if path.endswith("/status"):
+            return {"running": True, "protection_enabled": True, "version": "v0.107.50"}
+        if path.endswith("/stats"):
+            return {"num_dns_queries": 250000, "num_blocked_filtering": 31000, "blocked_filtering_percentage": 12.4,
+                    "top_queried_domains": [{"domain": "example.com"}], "top_blocked_domains": [{"domain": "ads.example"}]}
+        return httpx.Response(404)
+
+    def bazarr(self, request):
+        return {"data": {"version": "1.4.3", "episodes": 12}}
+
+    def gluetun(self, request):
+        if "vpn" in request.url.path:
+            return {"status": "running"}
+        return {"public_ip": "203.0.113.7", "region": "Zurich", "country": "Switzerland", "organization": "Example VPN"}
+
+    def jellyfin(self, request):
+        path = request.url.path
+        if path == "/Sessions":
+            return _sessions(self.scale.sessions)
+        if path == "/Items/Counts":
+            return {"MovieCount": 1800, "EpisodeCount": 42000}
+        return {"Version": "10.9.11"}
+
+    def jellyseerr(self, request):
+        if "user" in request.url.path:
+            return {"pageInfo": {"results": 12}, "results": []}
+        return {"pageInfo": {"results": 7}, "results": []}
+
+    def arr(self, request):
+        path = request.url.path
+        if path.endswith("/system/status"):
+            return {"version": "4.0.9"}
+        if path.endswith("/queue"):
+            # Paged like the real API (default pageSize 10)
+            params = request.url.params
+            return _queue(self.scale.queue, int(params.get("page", 1)), int(params.get("pageSize", 10)))
+        if path.endswith("/wanted/missing"):
+            return {"totalRecords": 37, "records": []}
+        if path.endswith("/history"):
+            return {"records": [{"sourceTitle": "Some.Show.S02E05.1080p"}]}
+        if path.endswith("/health"):
+            return []
+        return httpx.Response(404)
+
+    def portainer(self, request):
+        path = request.url.path
+        if path == "/api/endpoints":
+            return [{"Id": i, "Name": f"docker-{i}", "Type": 2, "Status": 1} for i in range(1, self.scale.environments + 1)]
+        if path.endswith("/docker/dashboard"):
+            return {"containerCount": 40, "runningContainerCount": 37, "stoppedContainerCount": 3,
+                    "unhealthyContainerCount": 0, "imageCount": 55, "volumeCount": 21}
+        if path == "/api/stacks":
+            return [{"Id": i} for i in range(12)]
+        return []
+
+    def prowlarr(self, request):
+        path = request.url.path
+        if path.endswith("/system/status"):
+            return {"version": "1.24.3"}
+        if path.endswith("/indexer/stats"):
+            return {"stats": [{"grabs": i} for i in range(self.scale.indexers)]}
+        return _indexers(self.scale.indexers)
+
+    def proxmox(self, request):
+        path = request.url.path
+        s = self.scale
+        if path.endswith("/cluster/resources"):
+            return _cluster_resources(s.nodes, s.guests_per_node, s.storages_per_node)
+        if "/storage/" in path:
+            return _storage_rrd(request.url.params.get("timeframe", "day"), int(self.started // 3600))
+        if path.endswith("/rrddata"):
+            return _node_rrd(int(self.started // 3600))
+        if path.endswith("/version"):
+            return {"data": {"version": "8.2.4", "release": "8.2"}}
+        return httpx.Response(404)
+
+    def qbittorrent(self, request):
+        path = request.url.path
+        if path.endswith("/auth/login"):
+            return httpx.Response(200, text="Ok.", headers={"set-cookie": "SID=bench; path=/"})
+        if "SID=bench" not in request.headers.get("cookie", "") and not path.endswith("/auth/login"):
+            return httpx.Response(403, text="Forbidden")
+        if path.endswith("/app/version"):
+            return httpx.Response(200, text="v4.6.5")
+        if path.endswith("/sync/maindata"):
+            rid = int(request.url.params.get("rid", 0))
+            if rid == 0:
+                return _maindata(self.scale.torrents)
+            # Steady state: a handful of torrents changed since the last sync
+            changed = {f"{i:040x}": {"dlspeed": self.random.randint(0, 10**7), "progress": self.random.random()}
+                       for i in self.random.sample(range(self.scale.torrents), min(20, self.scale.torrents))}
+            return {"rid": rid + 1, "torrents": changed, "server_state": {"dl_info_speed": 5 * 2**20, "up_info_speed": 2**20}}
+        return httpx.Response(404)
+
+    def slskd(self, request):
+        path = request.url.path
+        if path.endswith("/application"):
+            return {"version": {"current": "0.21.1"}, "current": "0.21.1"}
+        return _transfers(self.scale.transfers)
+
+    def speedtest(self, request):
+        page = int(request.url.params.get("page", 1))
+        rows, per_page = self.scale.speedtests, 25
+        now = self.started
+        data = [
+            {"id": rows - i, "created_at": time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime(now - 1800 * i)),
+             "download_bits": 9e8 + (i % 50) * 1e6, "upload_bits": 4e8, "ping": 8 + i % 7}
+            for i in range((page - 1) * per_page, min(page * per_page, rows))
+        ]
+        nxt = f"{request.url.scheme}://{request.url.host}/api/v1/results?sort=-created_at&page={page + 1}" if page * per_page < rows else None
+        return {"data": data, "links": {"next": nxt}}
+
+
+STATES = ["downloading", "uploading", "stalledDL", "pausedUP", "queuedDL", "error"]
+
+
+@lru_cache(maxsize=None)
+def _maindata(n: int) -> bytes:
+    torrents = {
+        f"{i:040x}": {"name": f"Some.Release.{i:05d}.1080p", "state": STATES[i % len(STATES)],
+                      "category": ("tv", "movies", "music", "")[i % 4], "progress": (i % 100) / 100,
+                      "dlspeed": (i % 7) * 150000, "size": 2**30 + i}
+        for i in range(n)
+    }
+    return json.dumps({"rid": 1, "full_update": True, "torrents": torrents, "categories": {},
+                       "server_state": {"dl_info_speed": 5 * 2**20, "up_info_speed": 2**20}}).encode()
+
+
+@lru_cache(maxsize=None)
+def _queue(n: int, page: int, page_size: int) -> bytes:
+    records = [{"id": i, "title": f"Some.Show.S01E{i % 99:02d}", "status": "downloading", "size": 2**30,
+                "sizeleft": 2**29, "trackedDownloadState": "downloading"}
+               for i in range((page - 1) * page_size, min(page * page_size, n))]
+    return json.dumps({"page": page, "pageSize": page_size, "totalRecords": n, "records": records}).encode()
+
+
+@lru_cache(maxsize=None)
+def _transfers(n: int) -> bytes:
+    states = ["Completed, Succeeded", "InProgress", "Queued, Remotely", "Completed"]
+    return json.dumps([{"id": f"{i:032x}", "filename": f"/music/Artist/Album/{i:05d}.flac", "state": states[i % 4],
+                        "size": 30_000_000, "bytesTransferred": i * 1000} for i in range(n)]).encode()
+
+
+@lru_cache(maxsize=None)
+def _sessions(n: int) -> bytes:
+    return json.dumps([{"UserName": f"user{i}", **({"NowPlayingItem": {"Name": f"Movie {i}"}} if i % 4 == 0 else {})}
+                       for i in range(n)]).encode()
+
+
+@lru_cache(maxsize=None)
+def _indexers(n: int) -> bytes:
+    return json.dumps([{"indexerId": i, "disabled": False} for i in range(n)]).encode()
+
+
+@lru_cache(maxsize=None)
+def _cluster_resources(nodes: int, guests: int, storages: int) -> bytes:
+    data = []
+    for n in range(nodes):
+        node = f"pve{n:02d}"
+        data.append({"type": "node", "node": node, "status": "online", "cpu": 0.2, "maxcpu": 32,
+                     "mem": 60 * 2**30, "maxmem": 128 * 2**30, "disk": 40 * 2**30, "maxdisk": 100 * 2**30, "uptime": 90 * DAY})
+        for g in range(guests):
+            vmid = 100 + n * guests + g
+            data.append({"type": ("qemu", "lxc")[g % 2], "vmid": vmid, "name": f"guest-{vmid}", "node": node,
+                         "status": "running" if g % 5 else "stopped", "cpu": 0.05, "mem": 2**31, "maxmem": 2**32,
+                         "disk": 0, "maxdisk": 32 * 2**30, "uptime": 10 * DAY})
+        for s in range(storages):
+            data.append({"type": "storage", "storage": f"store{s}", "node": node, "status": "available", "shared": 0,
+                         "disk": 2**40, "maxdisk": 4 * 2**40})
+    return json.dumps({"data": data}).encode()
+
+
+RRD_SPANS = {"hour": (3600, 60), "day": (DAY, 1800), "week": (7 * DAY, 10800), "month": (30 * DAY, 43200), "year": (365 * DAY, 7 * DAY)}
+
+
+@lru_cache(maxsize=None)
+def _storage_rrd(timeframe: str, hour: int) -> bytes:
+    span, step = RRD_SPANS.get(timeframe, RRD_SPANS["day"])
+    now = hour * 3600
+    return json.dumps({"data": [{"time": now - t, "used": 2**40 + (span - t) * 50_000, "total": 4 * 2**40}
+                                for t in range(0, span, step)]}).encode()
+
+
+@lru_cache(maxsize=None)
+def _node_rrd(hour: int) -> bytes:
+    now = hour * 3600
+    return json.dumps({"data": [{"time": now - t, "cpu": 0.1 + (t % 7) / 20, "memused": 60 * 2**30, "memtotal": 128 * 2**30,
+                                 "loadavg": 1.5} for t in range(0, DAY, 1800)]}).encode()
+
+
+def scale_from_args(pairs: Tuple[str, ...]) -> Scale:
+    # "torrents=10000" style overrides
+    scale = Scale()
+    for pair in pairs:
+        key, _, value = pair.partition("=")
+        if not hasattr(scale, key):
+            raise SystemExit(f"Unknown scale '{key}', expected one of: {', '.join(Scale.__dataclass_fields__)}")
+        setattr(scale, key, int(value))
+    return scale
@@ -0,0 +1,147 @@
+"""End-to-end report job against local mock services.
+
+Runs src.main.run_report_job with every one of the 14 services pointed at the
+in-process mocks from mock_services.py (real config loading, resilience, caching,
+history and outbox; SMTP replaced by a sink). Reports wall time per run, latency per
+collector, requests issued per service and the peak traced memory of one run.
+
+    python benchmarks/pipeline.py [--runs 3] [--latency 0.02] [--error-rate 0]
+                                  [--scale torrents=10000 --scale queue=5000 --scale nodes=50]
+                                  [--trace] [--profile]
+"""
+import os
+import sys
+import time
+import yaml
+import smtplib
+import logging
+import argparse
+import statistics
+import tempfile
+import tracemalloc
+from pathlib import Path
+from collections import Counter, defaultdict
+
+ROOT = Path(__file__).resolve().parents[1]
+# Service modules import `config.schema`, as when started with `python src/main.py`
+sys.path[:0] = [str(ROOT), str(ROOT / "src")]
+from mock_services import MockServices, scale_from_args  # noqa: E402
+
+
+class NullSMTP:
+    # Accepts every message, so the outbox is drained without a mail server
+    def __init__(self, *args, **kwargs):
+        pass
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+    def starttls(self, **kwargs):
+        pass
+
+    def login(self, *args):
+        pass
+
+    def sendmail(self, sender, recipients, message):
+        pass
+
+
+def write_config(directory: Path, mocks: MockServices, args) -> Path:
+    cfg = {
+        "schedule": {"time": "0 6 * * *", "timezone": "UTC"},
+        "email": {"smtp_server": "smtp.mock", "smtp_port": 587, "from_address": "bench@example.com",
+                  "to_address": "bench@example.com"},
+        "network": {"timeout": 10, "retries": args.retries},
+        "collection": {"max_concurrency": args.concurrency},
+        "tracing": {"enabled": args.trace or args.profile, "profile": args.profile},
+        **mocks.config(),
+    }
+    path = directory / "config.yaml"
+    path.write_text(yaml.safe_dump(cfg))
+    return path
+
+
+def main():
+    ap = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    ap.add_argument("--runs", type=int, default=3, help="Timed runs; the first one starts cold")
+    ap.add_argument("--latency", type=float, default=0.02, help="Mean seconds per mock request")
+    ap.add_argument("--error-rate", type=float, default=0.0, help="Share of requests answered with 503")
+    ap.add_argument("--retries", type=int, default=2)
+    ap.add_argument("--concurrency", type=int, default=8, help="collection.max_concurrency")
+    ap.add_argument("--scale", action="append", default=[], metavar="NAME=N",
+                    help="Payload size override, e.g. torrents=10000 (repeatable)")
+    ap.add_argument("--trace", action="store_true", help="Write a trace file per run under the data dir")
+    ap.add_argument("--profile", action="store_true", help="Also cProfile the collectors (implies --trace)")
+    ap.add_argument("--no-memory", action="store_true", help="Skip the tracemalloc run")
+    args = ap.parse_args()
+
+    mocks = MockServices(scale=scale_from_args(tuple(args.scale)), latency=args.latency, error_rate=args.error_rate)
+    workdir = Path(tempfile.mkdtemp(prefix="homelab-bench-"))
+    os.environ.update({
+        "CONFIG_PATH": str(write_config(workdir, mocks, args)), "DATA_DIR": str(workdir / "data"),
+        "SMTP_HOST": "smtp.mock", "SMTP_PORT": "587", "SMTP_USER": "bench", "SMTP_PASS": "bench", "EMAIL_FROM": "bench@example.com", "EMAIL_TO": "bench@example.com",
+    })
+    smtplib.SMTP = NullSMTP
+    logging.disable(logging.INFO) # Keep per-service log lines out of the results
+
+    from src import main as app, collector
+    from src.api.httpclient import registry, close_clients
+    from src.api.runtime import run_sync
+
+    registry.transport_factory = mocks.transport_factory
+
+    # Time each collector around its probe and build, as the job sees it
+    latencies = defaultdict(list)
+    statuses = defaultdict(Counter)
+    check = collector._check
+
+    async def timed_check(module, svc_cfg, net, probe_timeout, full):
+        start = time.perf_counter()
+        result = await check(module, svc_cfg, net, probe_timeout, full)
+        latencies[svc_cfg.name].append(time.perf_counter() - start)
+        statuses[svc_cfg.name][result.get("status")] += 1
+        return result
+
+    collector._check = timed_check
+
+    print(f"Scale: {mocks.scale}")
+    print(f"Latency {args.latency * 1000:.0f} ms, error rate {args.error_rate:.0%}, data in {workdir}\n")
+    walls = []
+    for i in range(args.runs):
+        before = sum(mocks.requests.values())
+        start = time.perf_counter()
+        app.run_report_job()
+        walls.append(time.perf_counter() - start)
+        print(f"run {i + 1}: {walls[-1]:7.3f}s  {sum(mocks.requests.values()) - before:5d} requests"
+              f"{'  (cold)' if i == 0 else ''}")
+
+    peak = None
+    if not args.no_memory:
+        tracemalloc.start()
+        app.run_report_job()
+        peak = tracemalloc.get_traced_memory()[1]
+        tracemalloc.stop()
+
+    print(f"\n{'collector':<22}{'first':>9}{'median':>9}{'max':>9}  requests   statuses")
+    runs = args.runs + (0 if args.no_memory else 1)
+    for name, kind in sorted((cfg["name"], kind) for kind, cfg in mocks.config().items()):
+        times = sorted(latencies[name])
+        if not times:
+            continue
+        print(f"{name:<22}{latencies[name][0]:9.3f}{statistics.median(times):9.3f}{times[-1]:9.3f}"
+              f"  {mocks.requests[kind] / runs:8.1f}/run  "
+              + ", ".join(f"{status} {n}" for status, n in statuses[name].most_common()))
+    total_bytes = sum(mocks.bytes_sent.values())
+    print(f"\nwall median {statistics.median(walls):.3f}s, {sum(mocks.requests.values())} requests, "
+          f"{total_bytes / 2**20:.1f} MiB served")
+    if peak is not None:
+        print(f"peak traced memory (one warm run): {peak / 2**20:.1f} MiB")
+
+    run_sync(close_clients())
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,85 @@
+"""Email render time: per-send Environment vs. the cached module environment.
+
+Builds a synthetic report with hundreds of service instances and times rendering
+the HTML and plain-text parts.
+
+    python benchmarks/render_report.py [--instances 300] [--repeat 20]
+"""
+import sys
+import time
+import argparse
+import tempfile
+from pathlib import Path
+
+from jinja2 import Environment, FileSystemLoader, FileSystemBytecodeCache
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+from src.email import sender  # noqa: E402
+
+
+def synthetic_report(instances: int) -> list:
+    report = []
+    for i in range(instances):
+        kind = ("Sonarr", "Radarr", "qBittorrent", "Proxmox")[i % 4]
+        status = "healthy" if i % 10 else "warning"
+        report.append({
+            "name": f"{kind} {i:03d}",
+            "status": status,
+            "reason": None if status == "healthy" else "2 Errors: Indexer unavailable...",
+            "data": {
+                "version": "4.0.1",
+                "queued_items": i % 17,
+                "missing_content_count": i * 3,
+                "containers": {"total": 20, "running": 18, "stopped": 2, "unhealthy": i % 2},
+                "latest_grab": f"Some.Show.S01E{i % 24:02d}",
+            },
+            "changes": {"queued_items": "+2 vs yesterday"} if i % 3 == 0 else {},
+        })
+    return report
+
+
+def timed(fn, repeat: int) -> float:
+    start = time.perf_counter()
+    for _ in range(repeat):
+        fn()
+    return (time.perf_counter() - start) / repeat * 1000
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--instances", type=int, default=300)
+    parser.add_argument("--repeat", type=int, default=20)
+    args = parser.parse_args()
+
+    report = synthetic_report(args.instances)
+    context = {"services": report, "date": "2026-01-01 06:00"}
+
+    def per_send():
+        # What send_report used to do on every call
+        env = Environment(loader=FileSystemLoader(str(sender.TEMPLATE_DIR)))
+        return env.get_template("template.html").render(**context)
+
+    with tempfile.TemporaryDirectory() as cache_dir:
+        def restart_with_bytecode_cache():
+            # A fresh process: the in-memory cache is empty but compiled bytecode is on disk
+            env = Environment(loader=FileSystemLoader(str(sender.TEMPLATE_DIR)),
+                              bytecode_cache=FileSystemBytecodeCache(cache_dir))
+            return env.get_template("template.html").render(**context)
+        restart_with_bytecode_cache()
+
+        env = sender.get_environment()
+        results = {
+            "per-send Environment (html)": timed(per_send, args.repeat),
+            "fresh Environment + bytecode cache (html)": timed(restart_with_bytecode_cache, args.repeat),
+            "cached environment (html)": timed(lambda: env.get_template("template.html").render(**context), args.repeat),
+            "cached environment (text)": timed(lambda: env.get_template("template.txt").render(**context), args.repeat),
+            "render_report (text + html)": timed(lambda: sender.render_report(report), args.repeat),
+        }
+
+    print(f"{args.instances} service instances, mean of {args.repeat} renders")
+    for label, ms in results.items():
+        print(f"  {label:<44} {ms:8.2f} ms")
+
+
+if __name__ == "__main__":
+    main()
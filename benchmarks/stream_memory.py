@@ -0,0 +1,95 @@
+"""Peak memory of streamed vs. whole-document JSON aggregation.
+
+Serves a synthetic slskd-style transfer list of growing size from an in-process
+transport and counts active transfers both ways, reporting tracemalloc peaks.
+
+    python benchmarks/stream_memory.py [--sizes 1000,10000,100000]
+"""
+import sys
+import json
+import asyncio
+import argparse
+import tracemalloc
+from pathlib import Path
+
+import httpx
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+from src.api.stream import Count, fold_json  # noqa: E402
+
+STATES = ["Completed", "InProgress", "Queued", "Cancelled"]
+CHUNK = 64 * 1024
+
+
+def transfer(i: int) -> dict:
+    return {
+        "id": f"{i:08x}-0000-0000-0000-000000000000",
+        "username": f"user{i % 97}",
+        "filename": f"/music/Artist {i % 500}/Album {i % 50}/{i:05d} - Track.flac",
+        "size": 30_000_000 + i,
+        "state": STATES[i % len(STATES)],
+        "bytesTransferred": i * 1024,
+        "averageSpeed": 512.0 * (i % 10),
+    }
+
+
+async def body(n: int):
+    # Generated chunk by chunk so the payload itself never sits in memory
+    buf = ["["]
+    size = 1
+    for i in range(n):
+        piece = ("," if i else "") + json.dumps(transfer(i))
+        buf.append(piece)
+        size += len(piece)
+        if size >= CHUNK:
+            yield "".join(buf).encode()
+            buf, size = [], 0
+    buf.append("]")
+    yield "".join(buf).encode()
+
+
+def client(n: int) -> httpx.AsyncClient:
+    def handler(request):
+        return httpx.Response(200, headers={"content-type": "application/json"}, content=body(n))
+    return httpx.AsyncClient(base_url="http://slskd", transport=httpx.MockTransport(handler))
+
+
+def payload_size(n: int) -> int:
+    return 2 + sum(len(json.dumps(transfer(i))) + 1 for i in range(n)) - 1
+
+
+async def whole(n: int) -> int:
+    async with client(n) as c:
+        items = (await c.get("/api/v0/transfers/downloads")).json()
+        return len([t for t in items if t.get("state") != "Completed"])
+
+
+async def streamed(n: int) -> int:
+    async with client(n) as c:
+        counts = await fold_json(c, "/api/v0/transfers/downloads", {"active": Count(lambda t: t.get("state") != "Completed")})
+        return counts["active"]
+
+
+def peak(fn, n: int):
+    tracemalloc.start()
+    result = asyncio.run(fn(n))
+    _, high = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return result, high
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--sizes", default="1000,10000,100000", help="Comma separated item counts")
+    args = parser.parse_args()
+
+    print(f"{'items':>8} {'payload':>10} {'whole peak':>11} {'stream peak':>12}")
+    for n in (int(s) for s in args.sizes.split(",")):
+        a, whole_peak = peak(whole, n)
+        b, stream_peak = peak(streamed, n)
+        assert a == b, (a, b)
+        print(f"{n:>8} {payload_size(n) / 2**20:>8.1f}MB {whole_peak / 2**20:>9.1f}MB {stream_peak / 2**20:>10.1f}MB")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,25 +1,34 @@
-import httpx
 from typing import Dict, Any
 from config.schema import AdGuardConfig, NetworkConfig
+from .fanout import Call, fan_out
+from .httpclient import pooled_client, get_json
+from .probe import probe
+from .runtime import run_sync
 
-def build_summary(cfg: AdGuardConfig, net: NetworkConfig) -> Dict[str, Any]:
+async def build_summary_async(cfg: AdGuardConfig, net: NetworkConfig) -> Dict[str, Any]:
     report = {"name": cfg.name, "status": "healthy", "reason": None}
     base = f"{str(cfg.url).rstrip('/')}/control"
     
     try:
-        with httpx.Client(base_url=base, auth=(cfg.username, cfg.password), verify=False, timeout=net.timeout) as c:
+        async with pooled_client(net, base, auth=(cfg.username, cfg.password)) as c:
+            results = await fan_out(
+                Call("status", lambda: get_json(c, "/status")),
+                Call("stats", lambda: get_json(c, "/stats")),
+                Call("filtering", lambda: get_json(c, "/filtering/status")),
+            )
+
             # Check Status
-            status = c.get("/status").json()
+            status = results["status"]
             if not status.get("running"):
                 report.update({"status": "down", "reason": "DNS service not running"})
             elif not status.get("protection_enabled"):
                 report.update({"status": "warning", "reason": "Protection disabled"})
 
             # Get Stats
-            stats = c.get("/stats").json()
+            stats = results["stats"]
             
             # Filtering Status
-            filtering = c.get("/filtering/status").json()
+            filtering = results["filtering"]
             if not filtering.get("enabled"):
                 report.update({"status": "warning", "reason": "Filtering disabled"})
 
@@ -34,3 +43,13 @@ def build_summary(cfg: AdGuardConfig, net: NetworkConfig) -> Dict[str, Any]:
     except Exception as e:
         report.update({"status": "down", "reason": str(e)})
     return report
+
+
+async def probe_async(cfg: AdGuardConfig, net: NetworkConfig, timeout: float) -> Dict[str, Any]:
+    async with pooled_client(net, f"{str(cfg.url).rstrip('/')}/control", auth=(cfg.username, cfg.password)) as c:
+        return await probe(c, cfg, "/status", timeout)
+
+
+def build_summary(cfg: AdGuardConfig, net: NetworkConfig) -> Dict[str, Any]:
+    # Sync shim for callers outside the collector loop
+    return run_sync(build_summary_async(cfg, net))
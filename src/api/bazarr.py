@@ -1,6 +1,8 @@
-import httpx
 from typing import Dict, Any
 from config.schema import BazarrConfig, NetworkConfig
+from .httpclient import pooled_client
+from .probe import probe
+from .runtime import run_sync
 
 
 def check_response(r):
@@ -22,13 +24,13 @@ def check_response(r):
         raise Exception(f"Invalid JSON response: {r.text[:50]}...")
 
 
-def build_summary(cfg: BazarrConfig, net: NetworkConfig) -> Dict[str, Any]:
+async def build_summary_async(cfg: BazarrConfig, net: NetworkConfig) -> Dict[str, Any]:
     report = {"name": cfg.name, "status": "healthy", "reason": None}
     params = {"apikey": cfg.api_key}
     
     try:
-        with httpx.Client(base_url=str(cfg.url).rstrip("/"), verify=False, timeout=net.timeout) as c:
-            r = check_response(c.get("/api/system/status", params=params))
+        async with pooled_client(net, str(cfg.url).rstrip("/")) as c:
+            r = check_response(await c.get("/api/system/status", params=params))
             data = r.get("data", {})
             report["data"] = {
                 "version": data.get("version"),
@@ -37,3 +39,13 @@ def build_summary(cfg: BazarrConfig, net: NetworkConfig) -> Dict[str, Any]:
     except Exception as e:
         report.update({"status": "down", "reason": str(e)})
     return report
+
+
+async def probe_async(cfg: BazarrConfig, net: NetworkConfig, timeout: float) -> Dict[str, Any]:
+    async with pooled_client(net, str(cfg.url).rstrip("/")) as c:
+        return await probe(c, cfg, "/api/system/status", timeout, params={"apikey": cfg.api_key})
+
+
+def build_summary(cfg: BazarrConfig, net: NetworkConfig) -> Dict[str, Any]:
+    # Sync shim for callers outside the collector loop
+    return run_sync(build_summary_async(cfg, net))
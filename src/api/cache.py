@@ -0,0 +1,173 @@
+import time
+import json
+import asyncio
+import sqlite3
+import hashlib
+import logging
+from collections import OrderedDict
+from contextlib import closing
+from dataclasses import dataclass
+from typing import List, Optional, Tuple
+
+import httpx
+
+from src.metrics import cache_requests, current_service
+from src.store import data_dir
+
+logger = logging.getLogger(__name__)
+
+# Modules opt in per request: c.get(path, extensions={CACHE_TTL: 3600})
+CACHE_TTL = "cache_ttl"
+
+# Stored bodies are already decoded, so these no longer describe them
+_BODY_HEADERS = {"content-encoding", "content-length", "transfer-encoding"}
+
+
+@dataclass
+class CachedResponse:
+    status_code: int
+    headers: List[Tuple[str, str]]
+    content: bytes # Decoded body; headers carry no content-encoding
+    expires_at: float
+
+    @property
+    def etag(self) -> Optional[str]:
+        return self._header("etag")
+
+    @property
+    def last_modified(self) -> Optional[str]:
+        return self._header("last-modified")
+
+    def _header(self, name: str) -> Optional[str]:
+        return next((v for k, v in self.headers if k.lower() == name), None)
+
+    def to_response(self, request: httpx.Request, from_cache: bool = True) -> httpx.Response:
+        return httpx.Response(self.status_code, headers=self.headers, content=self.content,
+                              request=request, extensions={"from_cache": from_cache})
+
+
+class _DiskTier:
+    # Optional second tier so slow-changing responses survive restarts
+    def __init__(self):
+        self.path = data_dir() / "http_cache.sqlite3"
+        with closing(sqlite3.connect(self.path)) as db, db:
+            db.execute(
+                "CREATE TABLE IF NOT EXISTS responses ("
+                " key TEXT PRIMARY KEY, status INTEGER, headers TEXT, content BLOB, expires_at REAL)"
+            )
+
+    def get(self, key: str) -> Optional[CachedResponse]:
+        with closing(sqlite3.connect(self.path, timeout=30)) as db:
+            row = db.execute("SELECT status, headers, content, expires_at FROM responses WHERE key = ?", (key,)).fetchone()
+        if row is None:
+            return None
+        return CachedResponse(row[0], [tuple(h) for h in json.loads(row[1])], row[2], row[3])
+
+    def put(self, key: str, entry: CachedResponse):
+        with closing(sqlite3.connect(self.path, timeout=30)) as db, db:
+            db.execute(
+                "INSERT OR REPLACE INTO responses VALUES (?, ?, ?, ?, ?)",
+                (key, entry.status_code, json.dumps(entry.headers), entry.content, entry.expires_at),
+            )
+
+
+class ResponseCache:
+    # In-memory LRU of GET responses, optionally backed by the disk tier.
+    # Expired entries are kept so they can be revalidated with ETag / Last-Modified.
+    def __init__(self):
+        self.enabled = True
+        self.max_entries = 512
+        self._memory: "OrderedDict[str, CachedResponse]" = OrderedDict()
+        self._disk: Optional[_DiskTier] = None
+
+    def configure(self, cfg):
+        self.enabled = cfg.enabled
+        self.max_entries = cfg.max_entries
+        if cfg.disk and self._disk is None:
+            self._disk = _DiskTier()
+        elif not cfg.disk:
+            self._disk = None
+        while len(self._memory) > self.max_entries:
+            self._memory.popitem(last=False)
+
+    @staticmethod
+    def key(request: httpx.Request) -> str:
+        # URL plus every request header, so different credentials never share an entry
+        h = hashlib.sha256(str(request.url).encode())
+        for name, value in sorted(request.headers.multi_items()):
+            h.update(f"\n{name}:{value}".encode())
+        return h.hexdigest()
+
+    async def get(self, key: str) -> Optional[CachedResponse]:
+        entry = self._memory.get(key)
+        if entry is not None:
+            self._memory.move_to_end(key)
+            return entry
+        if self._disk is not None:
+            entry = await asyncio.to_thread(self._disk.get, key)
+            if entry is not None:
+                self._remember(key, entry)
+        return entry
+
+    async def put(self, key: str, entry: CachedResponse):
+        self._remember(key, entry)
+        if self._disk is not None:
+            await asyncio.to_thread(self._disk.put, key, entry)
+
+    def _remember(self, key: str, entry: CachedResponse):
+        self._memory[key] = entry
+        self._memory.move_to_end(key)
+        while len(self._memory) > self.max_entries:
+            self._memory.popitem(last=False)
+
+
+class CachingTransport(httpx.AsyncBaseTransport):
+    # Serves GETs that declare a CACHE_TTL from the cache while fresh, revalidates them once stale
+    def __init__(self, inner: httpx.AsyncBaseTransport, cache: ResponseCache):
+        self.inner = inner
+        self.cache = cache
+
+    async def handle_async_request(self, request: httpx.Request) -> httpx.Response:
+        ttl = request.extensions.get(CACHE_TTL)
+        if not ttl or request.method != "GET" or not self.cache.enabled:
+            return await self.inner.handle_async_request(request)
+
+        key = self.cache.key(request)
+        cached = await self.cache.get(key)
+        now = time.time()
+        service = current_service.get() or request.url.host
+        if cached is not None and now < cached.expires_at:
+            cache_requests.inc(service=service, result="hit")
+            return cached.to_response(request)
+
+        # Stale: ask the server whether our copy is still good
+        if cached is not None:
+            if cached.etag:
+                request.headers["If-None-Match"] = cached.etag
+            if cached.last_modified:
+                request.headers["If-Modified-Since"] = cached.last_modified
+
+        response = await self.inner.handle_async_request(request)
+        if response.status_code == 304 and cached is not None:
+            await response.aclose()
+            cached.expires_at = now + ttl
+            await self.cache.put(key, cached)
+            cache_requests.inc(service=service, result="revalidated")
+            return cached.to_response(request)
+        cache_requests.inc(service=service, result="miss")
+        if response.status_code != 200:
+            return response
+
+        content = await response.aread()
+        await response.aclose()
+        headers = [(k, v) for k, v in response.headers.multi_items() if k.lower() not in _BODY_HEADERS]
+        entry = CachedResponse(200, headers, content, now + ttl)
+        await self.cache.put(key, entry)
+        return entry.to_response(request, from_cache=False)
+
+    async def aclose(self):
+        await self.inner.aclose()
+
+
+# Process-wide, shared by every pooled client
+response_cache = ResponseCache()
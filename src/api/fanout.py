@@ -0,0 +1,46 @@
+import asyncio
+from dataclasses import dataclass
+from typing import Any, Awaitable, Callable, Dict, Tuple
+
+
+@dataclass
+class Call:
+    # One endpoint call a collector needs.
+    # `fetch` is called with the results of the calls named in `after`, in that order.
+    name: str
+    fetch: Callable[..., Awaitable[Any]]
+    after: Tuple[str, ...] = ()
+    optional: bool = False # Failures return `default` instead of failing the whole collector
+    default: Any = None
+
+
+async def _run(call: Call, tasks: Dict[str, "asyncio.Task"]) -> Any:
+    deps = [await tasks[dep] for dep in call.after]
+    try:
+        return await call.fetch(*deps)
+    except Exception:
+        if call.optional:
+            return call.default
+        raise
+
+
+async def fan_out(*calls: Call) -> Dict[str, Any]:
+    # Run every call as soon as its dependencies are done.
+    # Independent calls overlap, so a collector takes as long as its slowest chain instead of the sum.
+    tasks: Dict[str, asyncio.Task] = {}
+    for call in calls:
+        if call.name in tasks:
+            raise ValueError(f"Duplicate call name: {call.name}")
+        missing = [dep for dep in call.after if dep not in tasks]
+        if missing:
+            raise ValueError(f"Call '{call.name}' depends on undeclared call(s): {', '.join(missing)}")
+        tasks[call.name] = asyncio.create_task(_run(call, tasks))
+
+    try:
+        results = await asyncio.gather(*tasks.values())
+    except BaseException:
+        # A required call failed (or we were cancelled): stop the rest
+        for task in tasks.values():
+            task.cancel()
+        raise
+    return dict(zip(tasks, results))
@@ -1,15 +1,21 @@
-import httpx
 from typing import Dict, Any
 from config.schema import GluetunConfig, NetworkConfig
+from .fanout import Call, fan_out
+from .httpclient import pooled_client, get_json
+from .probe import probe
+from .runtime import run_sync
 
-def build_summary(cfg: GluetunConfig, net: NetworkConfig) -> Dict[str, Any]:
+async def build_summary_async(cfg: GluetunConfig, net: NetworkConfig) -> Dict[str, Any]:
     report = {"name": cfg.name, "status": "healthy", "reason": None}
     headers = {"X-API-Key": cfg.api_key} if cfg.api_key else {}
     
     try:
-        with httpx.Client(base_url=str(cfg.url).rstrip("/"), headers=headers, verify=False, timeout=net.timeout) as c:
-            vpn = c.get("/v1/vpn/status").json()
-            ip = c.get("/v1/publicip/ip").json()
+        async with pooled_client(net, str(cfg.url).rstrip("/"), headers=headers) as c:
+            results = await fan_out(
+                Call("vpn", lambda: get_json(c, "/v1/vpn/status")),
+                Call("ip", lambda: get_json(c, "/v1/publicip/ip", ttl=300)),
+            )
+            vpn, ip = results["vpn"], results["ip"]
             
             if vpn.get("status") != "running":
                 report.update({"status": "down", "reason": "VPN not running"})
@@ -24,3 +30,14 @@ def build_summary(cfg: GluetunConfig, net: NetworkConfig) -> Dict[str, Any]:
     except Exception as e:
         report.update({"status": "down", "reason": str(e)})
     return report
+
+
+async def probe_async(cfg: GluetunConfig, net: NetworkConfig, timeout: float) -> Dict[str, Any]:
+    headers = {"X-API-Key": cfg.api_key} if cfg.api_key else {}
+    async with pooled_client(net, str(cfg.url).rstrip("/"), headers=headers) as c:
+        return await probe(c, cfg, "/v1/vpn/status", timeout)
+
+
+def build_summary(cfg: GluetunConfig, net: NetworkConfig) -> Dict[str, Any]:
+    # Sync shim for callers outside the collector loop
+    return run_sync(build_summary_async(cfg, net))
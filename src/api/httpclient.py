@@ -0,0 +1,128 @@
+import time
+import asyncio
+import logging
+from contextlib import asynccontextmanager
+from typing import Any, AsyncIterator, Callable, Dict, Optional, Tuple
+
+import httpx
+
+from .cache import CACHE_TTL, CachingTransport, response_cache
+from .resilience import CircuitBreaker, ResilientTransport
+from src.tracing import span
+
+logger = logging.getLogger(__name__)
+
+
+class _PooledClient:
+    def __init__(self, client: httpx.AsyncClient, transport: ResilientTransport):
+        self.client = client
+        self.transport = transport
+        self.in_use = 0
+        self.last_used = time.monotonic()
+
+
+def network_transport(base_url: str, verify: bool, limits: httpx.Limits) -> httpx.AsyncBaseTransport:
+    return httpx.AsyncHTTPTransport(verify=verify, limits=limits)
+
+
+class ClientRegistry:
+    # Process-wide pool of AsyncClients keyed by base URL + auth.
+    # Clients live for the whole scheduler process so every run reuses warm keep-alive connections.
+    # Only touched from the collector loop, so no locking is needed.
+    def __init__(self):
+        self._clients: Dict[Tuple, _PooledClient] = {}
+        # Breakers outlive clients so failures are remembered across runs and evictions
+        self._breakers: Dict[str, CircuitBreaker] = {}
+        # Builds the innermost (network) transport. The benchmark suite swaps in mock services here,
+        # keeping the retry, breaker and cache layers; set it before the first client is opened.
+        self.transport_factory: Callable[[str, bool, httpx.Limits], httpx.AsyncBaseTransport] = network_transport
+
+    @staticmethod
+    def _key(base_url: str, headers, auth, params, verify, timeout) -> Tuple:
+        return (
+            base_url,
+            tuple(sorted((headers or {}).items())),
+            tuple(auth) if auth else None,
+            tuple(sorted((params or {}).items())),
+            verify,
+            timeout,
+        )
+
+    def breaker(self, net, base_url: str) -> CircuitBreaker:
+        breaker = self._breakers.get(base_url)
+        if breaker is None:
+            breaker = self._breakers[base_url] = CircuitBreaker(base_url, net.breaker_threshold, net.breaker_cooldown)
+        breaker.threshold, breaker.cooldown = net.breaker_threshold, net.breaker_cooldown
+        return breaker
+
+    def acquire(self, net, base_url: str, *, headers: Optional[Dict[str, str]] = None, auth=None,
+                params: Optional[Dict[str, Any]] = None, verify: bool = False) -> _PooledClient:
+        self.evict_idle(net.idle_timeout)
+
+        key = self._key(base_url, headers, auth, params, verify, net.timeout)
+        entry = self._clients.get(key)
+        if entry is None or entry.client.is_closed:
+            limits = httpx.Limits(
+                max_connections=net.max_connections_per_host,
+                max_keepalive_connections=net.max_connections_per_host,
+                keepalive_expiry=net.keepalive_expiry,
+            )
+            transport = ResilientTransport(
+                self.transport_factory(base_url, verify, limits),
+                self.breaker(net, base_url), net,
+            )
+            client = httpx.AsyncClient(
+                base_url=base_url, headers=headers, auth=auth, params=params,
+                timeout=net.timeout, transport=CachingTransport(transport, response_cache),
+            )
+            entry = self._clients[key] = _PooledClient(client, transport)
+            logger.debug(f"Opened pooled client for {base_url}")
+        else:
+            # Pick up retry settings from a reloaded config
+            entry.transport.configure(net)
+
+        entry.in_use += 1
+        return entry
+
+    def release(self, entry: _PooledClient):
+        entry.in_use -= 1
+        entry.last_used = time.monotonic()
+
+    def evict_idle(self, idle_timeout: float):
+        # Close clients nobody has used for idle_timeout seconds
+        now = time.monotonic()
+        for key, entry in list(self._clients.items()):
+            if entry.in_use == 0 and now - entry.last_used > idle_timeout:
+                del self._clients[key]
+                asyncio.get_running_loop().create_task(entry.client.aclose())
+                logger.debug(f"Evicted idle client for {entry.client.base_url}")
+
+    async def aclose(self):
+        clients, self._clients = list(self._clients.values()), {}
+        await asyncio.gather(*(entry.client.aclose() for entry in clients), return_exceptions=True)
+
+
+registry = ClientRegistry()
+
+
+@asynccontextmanager
+async def pooled_client(net, base_url: str, **kwargs) -> AsyncIterator[httpx.AsyncClient]:
+    # Drop-in for `async with httpx.AsyncClient(...)`: hands out the shared client and leaves it open on exit
+    entry = registry.acquire(net, base_url, **kwargs)
+    try:
+        yield entry.client
+    finally:
+        registry.release(entry)
+
+
+async def get_json(c: httpx.AsyncClient, url: str, ttl: Optional[float] = None, **kwargs) -> Any:
+    # ttl: seconds the response may be served from the response cache
+    if ttl:
+        kwargs["extensions"] = {**kwargs.get("extensions", {}), CACHE_TTL: ttl}
+    r = await c.get(url, **kwargs)
+    with span("json decode", "decode", url=url):
+        return r.json()
+
+
+async def close_clients():
+    await registry.aclose()
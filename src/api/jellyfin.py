@@ -1,24 +1,33 @@
-import httpx
 from typing import Dict, Any
 from config.schema import JellyfinConfig, NetworkConfig
+from .fanout import Call, fan_out
+from .httpclient import pooled_client, get_json
+from .probe import probe
+from .stream import Collect, fold_json
+from .runtime import run_sync
 
-def build_summary(cfg: JellyfinConfig, net: NetworkConfig) -> Dict[str, Any]:
+async def build_summary_async(cfg: JellyfinConfig, net: NetworkConfig) -> Dict[str, Any]:
     report = {"name": cfg.name, "status": "healthy", "reason": None}
     auth = f'MediaBrowser Client="HomelabReport", Device="Server", DeviceId="12345", Version="1.0.0", Token="{cfg.api_key}"'
     headers = {"X-Emby-Authorization": auth, "Accept": "application/json"}
 
     try:
-        with httpx.Client(base_url=str(cfg.url).rstrip("/"), headers=headers, verify=False, timeout=net.timeout) as c:
-            info = c.get("/System/Info").json()
-            sessions = c.get("/Sessions").json()
-            counts = c.get("/Items/Counts").json()
-            
-            active = []
-            for s in sessions:
-                if "NowPlayingItem" in s:
+        async with pooled_client(net, str(cfg.url).rstrip("/"), headers=headers) as c:
+            # Only sessions with something playing are kept out of the streamed list
+            async def now_playing():
+                def describe(s):
                     user = s.get("UserName", "Unknown")
                     item = s["NowPlayingItem"].get("Name", "Unknown")
-                    active.append(f"{user} streaming {item}")
+                    return f"{user} streaming {item}"
+                found = await fold_json(c, "/Sessions", {"active": Collect(lambda s: "NowPlayingItem" in s, describe)})
+                return found["active"]
+
+            results = await fan_out(
+                Call("info", lambda: get_json(c, "/System/Info", ttl=3600)),
+                Call("active", now_playing),
+                Call("counts", lambda: get_json(c, "/Items/Counts", ttl=600)),
+            )
+            info, active, counts = results["info"], results["active"], results["counts"]
 
             report["data"] = {
                 "version": info.get("Version"),
@@ -30,3 +39,15 @@ def build_summary(cfg: JellyfinConfig, net: NetworkConfig) -> Dict[str, Any]:
     except Exception as e:
         report.update({"status": "down", "reason": str(e)})
     return report
+
+
+async def probe_async(cfg: JellyfinConfig, net: NetworkConfig, timeout: float) -> Dict[str, Any]:
+    auth = f'MediaBrowser Client="HomelabReport", Device="Server", DeviceId="12345", Version="1.0.0", Token="{cfg.api_key}"'
+    headers = {"X-Emby-Authorization": auth, "Accept": "application/json"}
+    async with pooled_client(net, str(cfg.url).rstrip("/"), headers=headers) as c:
+        return await probe(c, cfg, "/System/Info/Public", timeout)
+
+
+def build_summary(cfg: JellyfinConfig, net: NetworkConfig) -> Dict[str, Any]:
+    # Sync shim for callers outside the collector loop
+    return run_sync(build_summary_async(cfg, net))
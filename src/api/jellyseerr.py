@@ -1,25 +1,44 @@
-import httpx
 from typing import Dict, Any
 from config.schema import JellyseerrConfig, NetworkConfig
+from .fanout import Call, fan_out
+from .httpclient import pooled_client, get_json
+from .probe import probe
+from .runtime import run_sync
 
-def build_summary(cfg: JellyseerrConfig, net: NetworkConfig) -> Dict[str, Any]:
+async def build_summary_async(cfg: JellyseerrConfig, net: NetworkConfig) -> Dict[str, Any]:
     report = {"name": cfg.name, "status": "healthy", "reason": None}
     headers = {"X-Api-Key": cfg.api_key, "Accept": "application/json"}
     
     try:
-        with httpx.Client(base_url=str(cfg.url).rstrip("/"), headers=headers, verify=False, timeout=net.timeout) as c:
+        async with pooled_client(net, str(cfg.url).rstrip("/"), headers=headers) as c:
             # Stats
             # Jellyseerr doesn't have a simple stats endpoint, so I am fetching counts individually
-            pending = c.get("/api/v1/request", params={"take": 0, "filter": "pending"}).json().get("pageInfo", {}).get("results", 0)
-            approved = c.get("/api/v1/request", params={"take": 0, "filter": "approved"}).json().get("pageInfo", {}).get("results", 0)
-            
-            users = c.get("/api/v1/user", params={"take": 0}).json().get("pageInfo", {}).get("results", 0)
+            async def count(path, **params):
+                page = await get_json(c, path, params={"take": 0, **params})
+                return page.get("pageInfo", {}).get("results", 0)
+
+            results = await fan_out(
+                Call("pending", lambda: count("/api/v1/request", filter="pending")),
+                Call("approved", lambda: count("/api/v1/request", filter="approved")),
+                Call("users", lambda: count("/api/v1/user")),
+            )
 
             report["data"] = {
-                "pending_requests": pending,
-                "approved_requests": approved,
-                "total_users": users
+                "pending_requests": results["pending"],
+                "approved_requests": results["approved"],
+                "total_users": results["users"]
             }
     except Exception as e:
         report.update({"status": "down", "reason": str(e)})
     return report
+
+
+async def probe_async(cfg: JellyseerrConfig, net: NetworkConfig, timeout: float) -> Dict[str, Any]:
+    headers = {"X-Api-Key": cfg.api_key, "Accept": "application/json"}
+    async with pooled_client(net, str(cfg.url).rstrip("/"), headers=headers) as c:
+        return await probe(c, cfg, "/api/v1/status", timeout)
+
+
+def build_summary(cfg: JellyseerrConfig, net: NetworkConfig) -> Dict[str, Any]:
+    # Sync shim for callers outside the collector loop
+    return run_sync(build_summary_async(cfg, net))
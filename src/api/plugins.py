@@ -0,0 +1,104 @@
+import logging
+import importlib
+from importlib.metadata import entry_points
+from types import ModuleType
+from typing import Any, Dict, List, Optional
+
+from pydantic import BaseModel, ValidationError
+
+from src.collector import Check
+
+logger = logging.getLogger(__name__)
+
+# Third-party collectors register a module under this group, e.g. in their pyproject.toml:
+#   [project.entry-points."homelab_report.services"]
+#   unifi = "homelab_unifi.collector"
+# The module provides `Config` (a pydantic model for its config.yaml section) and
+# `build_summary_async(cfg, net)` or `build_summary(cfg, net)`.
+ENTRY_POINT_GROUP = "homelab_report.services"
+
+# Built-in services: config.yaml key -> module. Their schemas live in config/schema.py.
+BUILTIN_SERVICES = {
+    "adguard": "src.api.adguard",
+    "bazarr": "src.api.bazarr",
+    "gluetun": "src.api.gluetun",
+    "jellyfin": "src.api.jellyfin",
+    "jellyseerr": "src.api.jellyseerr",
+    "lidarr": "src.api.lidarr",
+    "portainer": "src.api.portainer",
+    "prowlarr": "src.api.prowlarr",
+    "proxmox": "src.api.proxmox",
+    "qbittorrent": "src.api.qbittorrent",
+    "radarr": "src.api.radarr",
+    "slskd": "src.api.slskd",
+    "sonarr": "src.api.sonarr",
+    "speedtest_tracker": "src.api.speedtest_tracker",
+}
+
+
+class ServiceRegistry:
+    # Knows every service by its config key, but only imports the ones a config enables
+    def __init__(self):
+        self._plugins = None
+
+    def plugins(self) -> Dict[str, Any]:
+        # Entry points are listed from package metadata; nothing is imported here
+        if self._plugins is None:
+            self._plugins = {}
+            for ep in entry_points(group=ENTRY_POINT_GROUP):
+                if ep.name in BUILTIN_SERVICES:
+                    logger.warning(f"Ignoring plugin '{ep.name}' ({ep.value}): name is taken by a built-in service")
+                    continue
+                self._plugins[ep.name] = ep
+        return self._plugins
+
+    def module(self, key: str) -> ModuleType:
+        if key in BUILTIN_SERVICES:
+            return importlib.import_module(BUILTIN_SERVICES[key])
+        ep = self.plugins().get(key)
+        if ep is None:
+            raise KeyError(f"Unknown service '{key}'")
+        return ep.load()
+
+    def enabled(self, cfg) -> List[Check]:
+        # One Check per configured instance, in name order. A section holds one instance or a list.
+        # Built-in sections were validated with AppConfig; plugin sections are validated
+        # here against the plugin's own Config model.
+        checks = []
+        for key in sorted(BUILTIN_SERVICES):
+            section = getattr(cfg, key, None)
+            if section is not None:
+                module = self.module(key)
+                checks += [Check(key, module, instance) for instance in _instances(section)]
+
+        plugins = self.plugins()
+        for key, raw in sorted((cfg.model_extra or {}).items()):
+            if raw is None:
+                continue
+            if key not in plugins:
+                logger.warning(f"Unknown section '{key}' in config, no service registered under that name")
+                continue
+            module = self.module(key)
+            schema: Optional[type] = getattr(module, "Config", None)
+            if schema is None or not issubclass(schema, BaseModel):
+                raise ValueError(f"Plugin '{key}' ({plugins[key].value}) does not define a pydantic Config model")
+            try:
+                checks += [Check(key, module, schema.model_validate(instance)) for instance in _instances(raw)]
+            except ValidationError as e:
+                raise ValueError(f"Invalid config for '{key}': {e}") from e
+
+        # Names identify services in the report and the history store
+        seen = set()
+        for check in checks:
+            if check.config.name in seen:
+                raise ValueError(f"Service name '{check.config.name}' is used more than once; give each instance its own name")
+            seen.add(check.config.name)
+        return checks
+
+
+def _instances(section) -> List[Any]:
+    return section if isinstance(section, list) else [section]
+
+
+# Process-wide; entry points are read once
+services = ServiceRegistry()
@@ -1,45 +1,115 @@
-import httpx
+import json
+import asyncio
 from typing import Dict, Any
 from config.schema import PortainerConfig, NetworkConfig
+from .fanout import Call, fan_out
+from .httpclient import pooled_client, get_json
+from .probe import probe
+from .runtime import run_sync
 
-def build_summary(cfg: PortainerConfig, net: NetworkConfig) -> Dict[str, Any]:
+# Endpoint types backed by a Docker API (local socket, agent, edge agent)
+DOCKER_TYPES = (1, 2, 4)
+ENDPOINT_UP = 1
+
+async def build_summary_async(cfg: PortainerConfig, net: NetworkConfig) -> Dict[str, Any]:
     report = {"name": cfg.name, "status": "healthy", "reason": None}
     headers = {"X-API-Key": cfg.token}
-    env_id = getattr(cfg, "environment", getattr(cfg, "enviroment", 1))
-
     try:
-        with httpx.Client(base_url=str(cfg.url).rstrip("/"), headers=headers, verify=False, timeout=net.timeout) as c:
-            # Auto-detect ID if needed
-            try:
-                all_envs = c.get("/api/endpoints").json()
-                if not any(e['Id'] == env_id for e in all_envs):
-                    env_id = all_envs[0]['Id']
-            except: pass
-            # Dashboard Stats
-            dash = c.get(f"/api/endpoints/{env_id}/docker/dashboard").json()
+        async with pooled_client(net, str(cfg.url).rstrip("/"), headers=headers) as c:
+            # Environments rarely change, so discovery is served from the response cache
+            all_envs = await get_json(c, "/api/endpoints", ttl=cfg.endpoints_ttl)
+            envs = [e for e in all_envs if e.get("Type") in DOCKER_TYPES]
+            if cfg.environments:
+                envs = [e for e in envs if e["Id"] in cfg.environments]
+                missing = set(cfg.environments) - {e["Id"] for e in envs}
+                if missing:
+                    raise Exception(f"Environment(s) not found: {', '.join(map(str, sorted(missing)))}")
+            elif cfg.environment is not None:
+                # Single-environment configs fall back to the first environment, as before
+                envs = [e for e in envs if e["Id"] == cfg.environment] or envs[:1]
+
+            limit = asyncio.Semaphore(cfg.concurrency)
+            # Dashboard, plus names of unhealthy containers when the dashboard reports any
+            async def environment(env):
+                if env.get("Status", ENDPOINT_UP) != ENDPOINT_UP:
+                    raise Exception("Environment is down")
+                async with limit:
+                    dash = await get_json(c, f"/api/endpoints/{env['Id']}/docker/dashboard")
+                    unhealthy = []
+                    if dash.get("unhealthyContainerCount", 0) > 0:
+                        filters = json.dumps({"health": ["unhealthy"]})
+                        containers = await get_json(c, f"/api/endpoints/{env['Id']}/docker/containers/json",
+                                                    params={"all": 1, "filters": filters})
+                        unhealthy = [(ct.get("Names") or ["?"])[0].lstrip("/") for ct in containers]
+                return dash, unhealthy
             # Stacks
-            stacks_count = 0
-            try:
-                stacks = c.get("/api/stacks").json()
-                stacks_count = len(stacks)
-            except: pass
+            async def stacks_count():
+                return len(await get_json(c, "/api/stacks"))
 
-            report["data"] = {
-                "environment_id": env_id,
-                "stacks": stacks_count,
-                "containers": {
+            # Every environment is independent; a failing one is reported, not fatal.
+            # Without environments, stacks is the only uncached call and has to succeed.
+            results = await fan_out(
+                Call("stacks", stacks_count, optional=bool(envs), default=0),
+                *(Call(e["Id"], lambda e=e: environment(e), optional=True) for e in envs),
+            )
+
+            fleet = {"total": 0, "running": 0, "stopped": 0, "unhealthy": 0}
+            images = volumes = 0
+            by_env, unhealthy_by_env, unreachable = {}, {}, []
+            for env in envs:
+                name = env.get("Name", str(env["Id"]))
+                result = results[env["Id"]]
+                if result is None:
+                    unreachable.append(name)
+                    by_env[name] = "unreachable"
+                    continue
+                dash, unhealthy = result
+                counts = {
                     "total": dash.get("containerCount", 0),
                     "running": dash.get("runningContainerCount", 0),
                     "stopped": dash.get("stoppedContainerCount", 0),
                     "unhealthy": dash.get("unhealthyContainerCount", 0),
-                },
-                "images": dash.get("imageCount", 0),
-                "volumes": dash.get("volumeCount", 0)
+                }
+                for k, v in counts.items():
+                    fleet[k] += v
+                images += dash.get("imageCount", 0)
+                volumes += dash.get("volumeCount", 0)
+                by_env[name] = f"{counts['running']}/{counts['total']} running, {counts['unhealthy']} unhealthy"
+                if unhealthy:
+                    unhealthy_by_env[name] = ", ".join(unhealthy)
+
+            if envs and len(unreachable) == len(envs):
+                raise Exception(f"No environment reachable ({', '.join(unreachable)})")
+
+            report["data"] = {
+                "environments": len(envs),
+                "stacks": results["stacks"],
+                "containers": fleet,
+                "images": images,
+                "volumes": volumes,
+                "by_environment": by_env,
             }
-            
-            if report["data"]["containers"]["unhealthy"] > 0:
-                report.update({"status": "warning", "reason": "Unhealthy containers detected"})
+            if unhealthy_by_env:
+                report["data"]["unhealthy_containers"] = unhealthy_by_env
+
+            problems = []
+            if fleet["unhealthy"] > 0:
+                problems.append("Unhealthy containers detected")
+            if unreachable:
+                problems.append(f"Environments unreachable: {', '.join(unreachable)}")
+            if problems:
+                report.update({"status": "warning", "reason": "; ".join(problems)})
 
     except Exception as e:
         report.update({"status": "down", "reason": str(e)})
     return report
+
+
+async def probe_async(cfg: PortainerConfig, net: NetworkConfig, timeout: float) -> Dict[str, Any]:
+    async with pooled_client(net, str(cfg.url).rstrip("/"), headers={"X-API-Key": cfg.token}) as c:
+        return await probe(c, cfg, "/api/system/status", timeout)
+
+
+def build_summary(cfg: PortainerConfig, net: NetworkConfig) -> Dict[str, Any]:
+    # Sync shim for callers outside the collector loop
+    return run_sync(build_summary_async(cfg, net))
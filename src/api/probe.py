@@ -0,0 +1,30 @@
+import time
+from typing import Any, Dict, Iterable
+
+import httpx
+
+from .resilience import RETRIES
+
+
+async def probe(c: httpx.AsyncClient, cfg, path: str, timeout: float, expect: Iterable[int] = (), **kwargs) -> Dict[str, Any]:
+    # Liveness tier: one cheap request with a tight timeout and no retries, reported in the same
+    # status model as the full summary. `expect` lists extra status codes that still mean "up".
+    report = {"name": cfg.name, "status": "healthy", "reason": None}
+    start = time.perf_counter()
+    try:
+        r = await c.get(path, timeout=timeout, extensions={RETRIES: 0}, **kwargs)
+    except httpx.TimeoutException:
+        report.update({"status": "down", "reason": f"No response within {timeout:g}s"})
+        return report
+    except httpx.HTTPError as e:
+        report.update({"status": "down", "reason": str(e) or type(e).__name__})
+        return report
+
+    if r.status_code >= 500:
+        report.update({"status": "down", "reason": f"HTTP {r.status_code}"})
+    elif r.status_code in (401, 403) and r.status_code not in expect:
+        report.update({"status": "warning", "reason": f"Reachable, but authentication failed (HTTP {r.status_code})"})
+    elif not r.is_success and r.status_code not in expect:
+        report.update({"status": "warning", "reason": f"Reachable, but {path} returned HTTP {r.status_code}"})
+    report["data"] = {"response_ms": round((time.perf_counter() - start) * 1000)}
+    return report
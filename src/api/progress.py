@@ -0,0 +1,41 @@
+import itertools
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Dict, Iterator, Optional
+
+
+class Progress:
+    # What a collector is doing right now, so a timed-out collector can say where it was stuck
+    def __init__(self):
+        self.started = False
+        self.in_flight: Dict[int, str] = {}
+        self.last: Optional[str] = None
+
+    def describe(self) -> str:
+        if not self.started:
+            return "waiting for a free collector slot"
+        if self.in_flight:
+            return "stuck on " + ", ".join(self.in_flight.values())
+        if self.last:
+            return f"after {self.last}"
+        return "before its first request"
+
+
+current_progress: ContextVar[Optional[Progress]] = ContextVar("current_progress", default=None)
+_ids = itertools.count()
+
+
+@contextmanager
+def step(label: str) -> Iterator[None]:
+    # Mark `label` as in flight for the current collector (no-op outside one)
+    progress = current_progress.get()
+    if progress is None:
+        yield
+        return
+    step_id = next(_ids)
+    progress.in_flight[step_id] = label
+    try:
+        yield
+    finally:
+        del progress.in_flight[step_id]
+        progress.last = label
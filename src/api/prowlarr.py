@@ -1,8 +1,12 @@
-import httpx
 from typing import Dict, Any
 from config.schema import ProwlarrConfig, NetworkConfig
+from .fanout import Call, fan_out
+from .httpclient import pooled_client, get_json
+from .probe import probe
+from .stream import Count, fold_json
+from .runtime import run_sync
 
-def build_summary(cfg: ProwlarrConfig, net: NetworkConfig) -> Dict[str, Any]:
+async def build_summary_async(cfg: ProwlarrConfig, net: NetworkConfig) -> Dict[str, Any]:
     report = {"name": cfg.name, "status": "healthy", "reason": None}
     
     api_key = cfg.api_key
@@ -14,47 +18,62 @@ def build_summary(cfg: ProwlarrConfig, net: NetworkConfig) -> Dict[str, Any]:
     params = {"apikey": api_key}
 
     try:
-        with httpx.Client(base_url=base, headers=headers, params=params, verify=False, timeout=net.timeout) as c:
-            # System Status
-            try:
-                r_sys = c.get("/system/status")
-                if r_sys.status_code == 401:
-                    raise Exception("Auth Failed (401)")
-                # Detect if HTML is fetched instead of JSON (login page or error)
-                if not r_sys.content or r_sys.text.strip().startswith("<"):
-                    raise Exception("Invalid Response (HTML/Login Page)")
-                    
-                sys_info = r_sys.json()
-            except Exception as e:
-                raise Exception(f"Connection Failed: {e}")
+        async with pooled_client(net, base, headers=headers, params=params) as c:
+            # System Status: not cached, it is the one required call and tells whether Prowlarr is up
+            async def sys_info():
+                try:
+                    r_sys = await c.get("/system/status")
+                    if r_sys.status_code == 401:
+                        raise Exception("Auth Failed (401)")
+                    # Detect if HTML is fetched instead of JSON (login page or error)
+                    if not r_sys.content or r_sys.text.strip().startswith("<"):
+                        raise Exception("Invalid Response (HTML/Login Page)")
+                        
+                    return r_sys.json()
+                except Exception as e:
+                    raise Exception(f"Connection Failed: {e}")
             # Indexer Stats
-            total_grabs = 0
-            try:
-                stats = c.get("/indexer/stats").json()
-                total_grabs = sum(s.get('grabs', 0) for s in stats.get('stats', []))
-            except:
-                pass 
+            async def total_grabs():
+                stats = await get_json(c, "/indexer/stats")
+                return sum(s.get('grabs', 0) for s in stats.get('stats', []))
             # Indexer Status
-            active_count = 0
-            failed_count = 0
-            try:
-                indexers = c.get("/indexerstatus").json()
-                failures = [i for i in indexers if i.get('disabled') or i.get('status') == 'failing']
-                active_count = len(indexers) - len(failures)
-                failed_count = len(failures)
-                
-                if failed_count > 0:
-                    report.update({"status": "warning", "reason": f"{failed_count} Indexers Failing"})
-            except:
-                pass
+            async def indexer_counts():
+                counts = await fold_json(c, "/indexerstatus", {
+                    "total": Count(),
+                    "failing": Count(lambda i: i.get('disabled') or i.get('status') == 'failing'),
+                })
+                return counts["total"] - counts["failing"], counts["failing"]
+
+            results = await fan_out(
+                Call("sys_info", sys_info),
+                Call("total_grabs", total_grabs, optional=True, default=0),
+                Call("indexer_counts", indexer_counts, optional=True, default=(0, 0)),
+            )
+            active_count, failed_count = results["indexer_counts"]
+            if failed_count > 0:
+                report.update({"status": "warning", "reason": f"{failed_count} Indexers Failing"})
 
             report["data"] = {
-                "version": sys_info.get("version"),
+                "version": results["sys_info"].get("version"),
                 "active_indexers": active_count,
                 "failed_indexers": failed_count,
-                "total_grabs_lifetime": total_grabs
+                "total_grabs_lifetime": results["total_grabs"]
             }
 
     except Exception as e:
         report.update({"status": "down", "reason": str(e)})
     return report
+
+
+async def probe_async(cfg: ProwlarrConfig, net: NetworkConfig, timeout: float) -> Dict[str, Any]:
+    base = str(cfg.url).rstrip("/")
+    if not base.endswith("/api/v1"):
+        base += "/api/v1"
+    params = {"apikey": cfg.api_key}
+    async with pooled_client(net, base, headers={"X-Api-Key": cfg.api_key}, params=params) as c:
+        return await probe(c, cfg, "/system/status", timeout)
+
+
+def build_summary(cfg: ProwlarrConfig, net: NetworkConfig) -> Dict[str, Any]:
+    # Sync shim for callers outside the collector loop
+    return run_sync(build_summary_async(cfg, net))
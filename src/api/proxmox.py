@@ -1,6 +1,26 @@
-import httpx
-from typing import Dict, Any
+import time
+import asyncio
+from typing import Dict, Any, List, Optional
 from config.schema import ProxmoxConfig, NetworkConfig
+from src.store.storage import StorageStore
+from .fanout import Call, fan_out
+from .httpclient import pooled_client
+from .probe import probe
+from .runtime import run_sync
+
+GUEST_TYPES = ('qemu', 'lxc')
+GIB = 1024 ** 3
+DAY = 86400
+# Smallest RRD timeframe covering a gap is fetched, so a run only pulls what is new
+TIMEFRAMES = [("hour", 3600), ("day", DAY), ("week", 7 * DAY), ("month", 30 * DAY), ("year", 365 * DAY)]
+
+_store: Optional[StorageStore] = None
+
+def get_store() -> StorageStore:
+    global _store
+    if _store is None:
+        _store = StorageStore()
+    return _store
 
 
 def check_response(r):
@@ -19,25 +39,167 @@ def check_response(r):
     except:
         raise Exception(f"Invalid JSON response: {r.text[:50]}...")
 
-def build_summary(cfg: ProxmoxConfig, net: NetworkConfig) -> Dict[str, Any]:
+def _pct(used, total) -> str:
+    return f"{used / total * 100:.0f}%" if total else "n/a"
+
+def _gib(used, total) -> str:
+    return f"{(used or 0) / GIB:.1f}/{(total or 0) / GIB:.1f} GiB"
+
+def _uptime(seconds) -> str:
+    days, rest = divmod(int(seconds or 0), 86400)
+    return f"{days}d {rest // 3600}h"
+
+def describe_node(n: Dict[str, Any]) -> str:
+    if n.get("status") != "online":
+        return n.get("status", "unknown")
+    return (f"CPU {n.get('cpu', 0) * 100:.0f}% of {n.get('maxcpu', 0)}, RAM {_gib(n.get('mem'), n.get('maxmem'))}, "
+            f"disk {_gib(n.get('disk'), n.get('maxdisk'))}, up {_uptime(n.get('uptime'))}")
+
+def describe_guest(g: Dict[str, Any]) -> str:
+    if g.get("status") != "running":
+        return f"{g.get('status', 'unknown')} on {g.get('node')}"
+    # Guest disk usage is only reported for containers; VMs show 0 without the guest agent
+    disk = f", disk {_gib(g.get('disk'), g.get('maxdisk'))}" if g.get("disk") else ""
+    return (f"running on {g.get('node')}, CPU {g.get('cpu', 0) * 100:.0f}%, "
+            f"RAM {_gib(g.get('mem'), g.get('maxmem'))}{disk}, up {_uptime(g.get('uptime'))}")
+
+def downsample(points: List[Dict[str, Any]], value) -> Optional[Dict[str, float]]:
+    # Collapse an RRD series to min/avg/max, skipping the gaps RRD reports as missing values
+    values = [v for v in (value(p) for p in points) if v is not None]
+    if not values:
+        return None
+    return {"min": min(values), "avg": sum(values) / len(values), "max": max(values)}
+
+def summarize_rrd(points: List[Dict[str, Any]]) -> str:
+    cpu = downsample(points, lambda p: p.get("cpu"))
+    mem = downsample(points, lambda p: p["memused"] / p["memtotal"] if p.get("memused") is not None and p.get("memtotal") else None)
+    load = downsample(points, lambda p: p.get("loadavg"))
+    parts = []
+    if cpu:
+        parts.append(f"CPU avg {cpu['avg'] * 100:.0f}% (min {cpu['min'] * 100:.0f}%, max {cpu['max'] * 100:.0f}%)")
+    if mem:
+        parts.append(f"RAM avg {mem['avg'] * 100:.0f}% (min {mem['min'] * 100:.0f}%, max {mem['max'] * 100:.0f}%)")
+    if load:
+        parts.append(f"load avg {load['avg']:.2f} (max {load['max']:.2f})")
+    return ", ".join(parts) or "no data"
+
+def timeframe(gap: float) -> str:
+    return next((name for name, span in TIMEFRAMES if span >= gap), TIMEFRAMES[-1][0])
+
+def days_to_full(fit: Dict[str, float]) -> Optional[float]:
+    # Days until the pool is full at the fitted rate, None when it isn't growing
+    if fit["slope_per_day"] <= 0 or not fit["total"]:
+        return None
+    return max(fit["total"] - fit["used"], 0) / fit["slope_per_day"]
+
+async def forecast_storage(c, cfg: ProxmoxConfig, resources: List[Dict[str, Any]]) -> Dict[str, Any]:
+    # Days-to-full per storage pool from a least-squares fit over its usage history
+    store = get_store()
+    source = str(cfg.host).rstrip("/")
+    now = time.time()
+    window = cfg.storage_window_days * DAY
+
+    pools = {}
+    for r in resources:
+        if r.get("type") != "storage" or r.get("status") != "available":
+            continue
+        # Shared storage is listed once per node, fit it once
+        key = r.get("storage") if r.get("shared") else f"{r.get('storage')}@{r.get('node')}"
+        pools.setdefault(key, (r.get("node"), r.get("storage")))
+
+    marks = await asyncio.to_thread(store.watermarks, source)
+
+    async def new_points(pool):
+        node, storage = pool
+        since = marks.get(pool, now - window)
+        r = await c.get(f"/nodes/{node}/storage/{storage}/rrddata",
+                        params={"timeframe": timeframe(now - since), "cf": "AVERAGE"})
+        return [
+            (p["time"], p["used"], p["total"]) for p in check_response(r).get("data", [])
+            if p.get("time", 0) >= since and p.get("used") is not None and p.get("total")
+        ]
+
+    fetched = await fan_out(*(
+        Call(key, lambda pool=pool: new_points(pool), optional=True, default=[]) for key, pool in pools.items()
+    ))
+
+    def sync_store():
+        for key, points in fetched.items():
+            store.add(source, pools[key], points)
+        store.prune(source, now - window)
+        return store.fit(source, now - window)
+    fits = await asyncio.to_thread(sync_store)
+
+    storage, filling = {}, []
+    for key, pool in sorted(pools.items()):
+        fit = fits.get(pool)
+        if fit is None:
+            storage[key] = "not enough history yet"
+            continue
+        days = days_to_full(fit)
+        usage = f"{_pct(fit['used'], fit['total'])} of {fit['total'] / GIB / 1024:.2f} TiB"
+        if days is None:
+            storage[key] = f"{usage}, not growing"
+        else:
+            storage[key] = f"{usage}, full in ~{days:.0f}d (+{fit['slope_per_day'] / GIB:.1f} GiB/day)"
+            if days <= cfg.storage_horizon_days:
+                filling.append(f"{key} full in ~{days:.0f}d")
+    return {"storage": storage, "filling": filling}
+
+async def build_summary_async(cfg: ProxmoxConfig, net: NetworkConfig) -> Dict[str, Any]:
     report = {"name": cfg.name, "status": "healthy", "reason": None}
     # Proxmox Header Auth
     headers = {"Authorization": f"PVEAPIToken={cfg.username}={cfg.api_token}"}
     base = f"{str(cfg.host).rstrip('/')}/api2/json"
 
     try:
-        with httpx.Client(base_url=base, headers=headers, verify=False, timeout=net.timeout) as c:
-            nodes_data = check_response(c.get("/nodes"))
-            nodes = nodes_data.get("data", [])
-            
+        async with pooled_client(net, base, headers=headers) as c:
+            # One bulk call covers every node and guest in the cluster
+            resources = check_response(await c.get("/cluster/resources")).get("data", [])
+            nodes = sorted((r for r in resources if r.get("type") == "node"), key=lambda r: r.get("node", ""))
+            guests = sorted((r for r in resources if r.get("type") in GUEST_TYPES and not r.get("template")),
+                            key=lambda r: r.get("vmid", 0))
+
             offline = [n["node"] for n in nodes if n.get("status") != "online"]
             if offline:
                 report.update({"status": "down", "reason": f"Nodes offline: {', '.join(offline)}"})
 
             report["data"] = {
                 "nodes_online": len(nodes) - len(offline),
-                "vms_running": sum(n.get("active_vms", 0) for n in nodes)
+                "vms_running": sum(1 for g in guests if g.get("status") == "running"),
+                "guests_total": len(guests),
+                "nodes": {n["node"]: describe_node(n) for n in nodes},
+                "guests": {f"{g.get('name', g.get('vmid'))} ({g.get('vmid')})": describe_guest(g) for g in guests},
             }
+
+            # Optional 24h trends: one rrddata call per online node, all at once
+            if cfg.rrd:
+                async def node_trend(node):
+                    r = await c.get(f"/nodes/{node}/rrddata", params={"timeframe": "day", "cf": "AVERAGE"})
+                    return summarize_rrd(check_response(r).get("data", []))
+
+                online = [n["node"] for n in nodes if n.get("status") == "online"]
+                report["data"]["trends_24h"] = await fan_out(*(
+                    Call(node, lambda node=node: node_trend(node), optional=True, default="unavailable")
+                    for node in online
+                ))
+
+            if cfg.storage_forecast:
+                forecast = await forecast_storage(c, cfg, resources)
+                report["data"]["storage"] = forecast["storage"]
+                if forecast["filling"] and report["status"] == "healthy":
+                    report.update({"status": "warning", "reason": f"Storage filling: {', '.join(forecast['filling'])}"})
     except Exception as e:
         report.update({"status": "down", "reason": str(e)})
     return report
+
+
+async def probe_async(cfg: ProxmoxConfig, net: NetworkConfig, timeout: float) -> Dict[str, Any]:
+    headers = {"Authorization": f"PVEAPIToken={cfg.username}={cfg.api_token}"}
+    async with pooled_client(net, f"{str(cfg.host).rstrip('/')}/api2/json", headers=headers) as c:
+        return await probe(c, cfg, "/version", timeout)
+
+
+def build_summary(cfg: ProxmoxConfig, net: NetworkConfig) -> Dict[str, Any]:
+    # Sync shim for callers outside the collector loop
+    return run_sync(build_summary_async(cfg, net))
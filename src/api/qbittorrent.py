@@ -1,43 +1,127 @@
-import httpx
-from typing import Dict, Any
+import heapq
+import asyncio
+from collections import Counter
+from typing import Dict, Any, Optional, Tuple
 from config.schema import QbittorrentConfig, NetworkConfig
+from .httpclient import pooled_client
+from .probe import probe
+from .runtime import run_sync
 
-def build_summary(cfg: QbittorrentConfig, net: NetworkConfig) -> Dict[str, Any]:
+ACTIVE_STATES = ('downloading', 'uploading', 'stalledDL')
+ERROR_STATES = ('error', 'missingFiles')
+
+
+class TorrentMirror:
+    # In-memory copy of the client's torrent list, kept current with sync/maindata rid deltas.
+    # State and category counts are adjusted per changed torrent instead of re-walking the whole list.
+    # The rid only means something within the WebUI session it was issued in, so the session cookie
+    # is kept here too: the pooled client holding it is closed when idle, e.g. between daily runs.
+    def __init__(self):
+        self.rid = 0
+        self.sid: Optional[str] = None
+        self.lock = asyncio.Lock()
+        self.reset()
+
+    def reset(self):
+        self.torrents: Dict[str, Dict[str, Any]] = {}
+        self.server_state: Dict[str, Any] = {}
+        self.states = Counter()
+        self.categories = Counter()
+        self.active = set()
+
+    def _count(self, h: str, t: Dict[str, Any], sign: int):
+        state = t.get('state')
+        self.states[state] += sign
+        self.categories[t.get('category') or 'Uncategorized'] += sign
+        if state in ACTIVE_STATES:
+            if sign > 0: self.active.add(h)
+            else: self.active.discard(h)
+
+    def apply(self, data: Dict[str, Any]):
+        if data.get("full_update"):
+            self.reset()
+        for h in data.get("torrents_removed", []):
+            old = self.torrents.pop(h, None)
+            if old is not None:
+                self._count(h, old, -1)
+        for h, changes in data.get("torrents", {}).items():
+            t = self.torrents.get(h)
+            if t is None:
+                t = self.torrents[h] = {}
+            else:
+                self._count(h, t, -1)
+            t.update(changes)
+            self._count(h, t, +1)
+        self.server_state.update(data.get("server_state", {}))
+        self.rid = data.get("rid", self.rid)
+
+    def top_active(self, n: int = 3):
+        return heapq.nlargest(n, (self.torrents[h] for h in self.active), key=lambda x: x.get('dlspeed', 0))
+
+
+# One mirror per client instance, kept for the life of the process
+_mirrors: Dict[Tuple[str, str], TorrentMirror] = {}
+
+
+async def _login(c, cfg: QbittorrentConfig) -> Optional[str]:
+    # Returns the new session id
+    c.cookies.clear() # Drop an expired SID so only the new one is sent
+    r = await c.post("/api/v2/auth/login", data={"username": cfg.username, "password": cfg.password})
+    if r.status_code != 200 or r.text.strip() != "Ok.":
+        raise Exception(f"Login Failed ({r.status_code}: {r.text.strip()[:50]})")
+    return r.cookies.get("SID")
+
+
+async def build_summary_async(cfg: QbittorrentConfig, net: NetworkConfig) -> Dict[str, Any]:
     report = {"name": cfg.name, "status": "healthy", "reason": None}
-    
+    base = str(cfg.url).rstrip("/")
+    mirror = _mirrors.setdefault((base, cfg.username), TorrentMirror())
+
     try:
-        with httpx.Client(base_url=str(cfg.url).rstrip("/"), verify=False, timeout=net.timeout) as c:
-            # Login
-            c.post("/api/v2/auth/login", data={"username": cfg.username, "password": cfg.password})
-            # Global Transfer Info
-            info = c.get("/api/v2/transfer/info").json()
-            # All Torrents
-            torrents = c.get("/api/v2/torrents/info").json()
-            # Process Data
-            active = [t for t in torrents if t['state'] in ('downloading', 'uploading', 'stalledDL')]
-            errored = [t for t in torrents if t['state'] in ('error', 'missingFiles')]
-            # Categories
-            cats = {}
-            for t in torrents:
-                cat = t.get('category') or 'Uncategorized'
-                cats[cat] = cats.get(cat, 0) + 1
+        # We only log in when the session is missing or expired. The session outlives the pooled client,
+        # but not qBittorrent's own WebUI session timeout: after that the next run logs in and starts over.
+        async with pooled_client(net, base) as c, mirror.lock:
+            if mirror.sid and "SID" not in c.cookies:
+                c.cookies.set("SID", mirror.sid)
+            r = await c.get("/api/v2/sync/maindata", params={"rid": mirror.rid})
+            if r.status_code == 403:
+                mirror.sid = await _login(c, cfg)
+                # A new session has no history of our rid: start from a full update
+                mirror.rid = 0
+                r = await c.get("/api/v2/sync/maindata", params={"rid": 0})
+            r.raise_for_status()
+            mirror.apply(r.json())
+
+            info = mirror.server_state
             # Top 3 Active
-            top_active = sorted(active, key=lambda x: x.get('dlspeed', 0), reverse=True)[:3]
             top_active_clean = [{
-                'name': t['name'][:30], 
-                'progress': f"{t['progress']*100:.1f}%", 
+                'name': t['name'][:30],
+                'progress': f"{t['progress']*100:.1f}%",
                 'speed': f"{t['dlspeed']/1024/1024:.1f} MB/s"
-            } for t in top_active]
+            } for t in mirror.top_active(3)]
 
             report["data"] = {
                 "dl_speed": f"{info.get('dl_info_speed', 0)/1024/1024:.2f} MB/s",
                 "up_speed": f"{info.get('up_info_speed', 0)/1024/1024:.2f} MB/s",
-                "total_torrents": len(torrents),
-                "active_count": len(active),
-                "error_count": len(errored),
-                "categories": cats,
+                "total_torrents": len(mirror.torrents),
+                "active_count": len(mirror.active),
+                "error_count": sum(mirror.states[s] for s in ERROR_STATES),
+                "categories": {cat: n for cat, n in mirror.categories.items() if n > 0},
                 "top_active": top_active_clean
             }
     except Exception as e:
+        # Next run starts over with a full update
+        mirror.rid = 0
         report.update({"status": "down", "reason": str(e)})
     return report
+
+
+async def probe_async(cfg: QbittorrentConfig, net: NetworkConfig, timeout: float) -> Dict[str, Any]:
+    # Answers 403 until the summary has logged in, which still proves the Web UI is up
+    async with pooled_client(net, str(cfg.url).rstrip("/")) as c:
+        return await probe(c, cfg, "/api/v2/app/version", timeout, expect={403})
+
+
+def build_summary(cfg: QbittorrentConfig, net: NetworkConfig) -> Dict[str, Any]:
+    # Sync shim for callers outside the collector loop
+    return run_sync(build_summary_async(cfg, net))
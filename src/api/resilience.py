@@ -0,0 +1,162 @@
+import time
+import random
+import asyncio
+import logging
+from typing import Optional
+
+import httpx
+
+from src import tracing
+from src.metrics import current_service, endpoint_label, http_duration, http_requests, http_response_bytes, http_retries
+from .progress import step
+
+logger = logging.getLogger(__name__)
+
+# Only these are safe to send twice
+IDEMPOTENT_METHODS = {"GET", "HEAD", "OPTIONS"}
+RETRY_STATUS = {429, 502, 503, 504}
+# Per-request override of the retry count: c.get(path, extensions={RETRIES: 0})
+RETRIES = "retries"
+
+
+class CircuitOpenError(httpx.TransportError):
+    pass
+
+
+class CircuitBreaker:
+    # Per-service failure memory that outlives a single run.
+    # After `threshold` consecutive failures the breaker opens and requests fail immediately.
+    # Once `cooldown` has passed requests are let through again (half-open): the first
+    # success closes the breaker, a failure re-opens it for another cooldown.
+    def __init__(self, name: str, threshold: int, cooldown: float):
+        self.name = name
+        self.threshold = threshold
+        self.cooldown = cooldown
+        self.failures = 0
+        self.opened_at: Optional[float] = None
+
+    @property
+    def state(self) -> str:
+        if self.opened_at is None:
+            return "closed"
+        if time.monotonic() - self.opened_at >= self.cooldown:
+            return "half-open"
+        return "open"
+
+    def before_request(self):
+        if self.state == "open":
+            remaining = self.cooldown - (time.monotonic() - self.opened_at)
+            raise CircuitOpenError(
+                f"Circuit open for {self.name} after {self.failures} consecutive failures; retrying in {remaining:.0f}s"
+            )
+
+    def record_success(self):
+        if self.opened_at is not None:
+            logger.info(f"Circuit closed for {self.name}")
+        self.failures = 0
+        self.opened_at = None
+
+    def record_failure(self):
+        self.failures += 1
+        if self.opened_at is not None or self.failures >= self.threshold:
+            if self.opened_at is None:
+                logger.warning(f"Circuit opened for {self.name} after {self.failures} consecutive failures")
+            self.opened_at = time.monotonic()
+
+
+class _MeteredStream(httpx.AsyncByteStream):
+    # Counts body bytes as the caller reads them, so streamed responses are measured too
+    def __init__(self, inner: httpx.AsyncByteStream, service: str, endpoint: str):
+        self.inner = inner
+        self.labels = {"service": service, "endpoint": endpoint}
+        self.size = 0
+        self.recorded = False
+
+    async def __aiter__(self):
+        async for chunk in self.inner:
+            self.size += len(chunk)
+            yield chunk
+        self._record()
+
+    def _record(self):
+        if not self.recorded:
+            self.recorded = True
+            http_response_bytes.observe(self.size, **self.labels)
+
+    async def aclose(self):
+        self._record()
+        await self.inner.aclose()
+
+
+class ResilientTransport(httpx.AsyncBaseTransport):
+    # Retries idempotent requests with exponential backoff + full jitter, behind a circuit breaker
+    def __init__(self, inner: httpx.AsyncBaseTransport, breaker: CircuitBreaker, net):
+        self.inner = inner
+        self.breaker = breaker
+        self.configure(net)
+
+    def configure(self, net):
+        self.retries = net.retries
+        self.backoff = net.retry_backoff
+        self.max_backoff = net.retry_max_backoff
+
+    def _delay(self, attempt: int) -> float:
+        return random.uniform(0, min(self.max_backoff, self.backoff * 2 ** attempt))
+
+    async def handle_async_request(self, request: httpx.Request) -> httpx.Response:
+        service = current_service.get() or request.url.host
+        endpoint = endpoint_label(request.url.path)
+        trace = tracing.active()
+        if trace is not None:
+            # Slice per request, with connect / TLS / wait / download phases reported by httpcore
+            span_id, tid, on_event = tracing.http_tracer(trace)
+            request.extensions = {**request.extensions, "trace": on_event}
+            trace.begin(f"{request.method} {endpoint}", "http", span_id, tid, {"service": service})
+        start = time.perf_counter()
+        try:
+            self.breaker.before_request()
+            with step(f"{request.method} {request.url.path}"):
+                response = await self._send(request, service, endpoint)
+        except httpx.TransportError as e:
+            http_requests.inc(service=service, endpoint=endpoint, code="error")
+            if trace is not None:
+                trace.end(f"{request.method} {endpoint}", "http", span_id, tid, {"error": repr(e)})
+            raise
+        http_duration.observe(time.perf_counter() - start, service=service, endpoint=endpoint)
+        http_requests.inc(service=service, endpoint=endpoint, code=str(response.status_code))
+        if trace is not None:
+            trace.end(f"{request.method} {endpoint}", "http", span_id, tid, {"status": response.status_code})
+        if isinstance(response.stream, httpx.ByteStream):
+            # Body already in memory (cached or mocked responses)
+            http_response_bytes.observe(len(response.content), service=service, endpoint=endpoint)
+        else:
+            response.stream = _MeteredStream(response.stream, service, endpoint)
+        return response
+
+    async def _send(self, request: httpx.Request, service: str, endpoint: str) -> httpx.Response:
+        retries = request.extensions.get(RETRIES, self.retries) if request.method in IDEMPOTENT_METHODS else 0
+
+        for attempt in range(retries + 1):
+            last = attempt == retries
+            try:
+                response = await self.inner.handle_async_request(request)
+            except httpx.TransportError as e:
+                if last:
+                    self.breaker.record_failure()
+                    raise
+                logger.debug(f"{request.method} {request.url} failed ({e!r}), retry {attempt + 1}/{retries}")
+                http_retries.inc(service=service, endpoint=endpoint)
+            else:
+                if response.status_code not in RETRY_STATUS or last:
+                    if response.status_code >= 500:
+                        self.breaker.record_failure()
+                    else:
+                        self.breaker.record_success()
+                    return response
+                await response.aclose()
+                logger.debug(f"{request.method} {request.url} returned {response.status_code}, retry {attempt + 1}/{retries}")
+                http_retries.inc(service=service, endpoint=endpoint)
+            await asyncio.sleep(self._delay(attempt))
+
+    async def aclose(self):
+        await self.inner.aclose()
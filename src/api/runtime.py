@@ -0,0 +1,33 @@
+import asyncio
+import threading
+from typing import Any, Coroutine, Optional
+
+# One long-lived event loop shared by every collector.
+# It runs in a daemon thread so the scheduler (and any sync caller) can hand it coroutines.
+_loop: Optional[asyncio.AbstractEventLoop] = None
+_lock = threading.Lock()
+
+
+def get_loop() -> asyncio.AbstractEventLoop:
+    global _loop
+    with _lock:
+        if _loop is None or _loop.is_closed():
+            _loop = asyncio.new_event_loop()
+            thread = threading.Thread(target=_loop.run_forever, name="collector-loop", daemon=True)
+            thread.start()
+    return _loop
+
+
+def run_sync(coro: Coroutine[Any, Any, Any], timeout: Optional[float] = None) -> Any:
+    # Blocking bridge from sync code into the collector loop
+    loop = get_loop()
+    try:
+        running = asyncio.get_running_loop()
+    except RuntimeError:
+        running = None
+    if running is loop:
+        coro.close()
+        raise RuntimeError("run_sync() called from the collector loop; await the coroutine instead")
+
+    future = asyncio.run_coroutine_threadsafe(coro, loop)
+    return future.result(timeout)
@@ -1,45 +1,50 @@
-import httpx
 from typing import Dict, Any
 from config.schema import SlskdConfig, NetworkConfig
+from .fanout import Call, fan_out
+from .httpclient import pooled_client
+from .probe import probe
+from .stream import Count, fold_json
+from .runtime import run_sync
 
-def build_summary(cfg: SlskdConfig, net: NetworkConfig) -> Dict[str, Any]:
+# Transfer states that no longer count as active
+FINISHED_STATES = ['Completed', 'Cancelled', 'Aborted']
+
+async def build_summary_async(cfg: SlskdConfig, net: NetworkConfig) -> Dict[str, Any]:
     report = {"name": cfg.name, "status": "healthy", "reason": None}
     headers = {"X-API-Key": cfg.api_key}
     
     try:
-        with httpx.Client(base_url=str(cfg.url).rstrip("/"), headers=headers, verify=False, timeout=net.timeout) as c:
+        async with pooled_client(net, str(cfg.url).rstrip("/"), headers=headers) as c:
             # Version
-            r_app = c.get("/api/v0/application")
-            if r_app.status_code == 404: r_app = c.get("/api/v1/application")
-
-            version_str = "Unknown"
-            if r_app.status_code == 200:
-                v_data = r_app.json()
-                # Try current first, then full, then version
-                version_str = v_data.get("current") or v_data.get("full") or v_data.get("version") or "Unknown"
-            # Downloads
-            dl_active = 0
-            dl_total = 0
-            try:
-                dls = c.get("/api/v0/transfers/downloads").json()
-                dl_total = len(dls)
-                # Active (anything not finished)
-                dl_active = len([d for d in dls if d.get('state') not in ['Completed', 'Cancelled', 'Aborted']])
-            except:
-                pass
-            # Uploads
-            ul_active = 0
-            ul_total = 0
-            try:
-                uls = c.get("/api/v0/transfers/uploads").json()
-                ul_total = len(uls)
-                # Active (anything not finished)
-                ul_active = len([u for u in uls if u.get('state') not in ['Completed', 'Cancelled', 'Aborted']])
-            except:
-                pass
+            async def version():
+                r_app = await c.get("/api/v0/application")
+                if r_app.status_code == 404: r_app = await c.get("/api/v1/application")
+
+                version_str = "Unknown"
+                if r_app.status_code == 200:
+                    v_data = r_app.json()
+                    # Try current first, then full, then version
+                    version_str = v_data.get("current") or v_data.get("full") or v_data.get("version") or "Unknown"
+                return version_str
+            # Downloads / Uploads: (active, total)
+            async def transfers(path):
+                # Streamed: transfer lists grow with every queued file
+                counts = await fold_json(c, path, {
+                    "active": Count(lambda t: t.get('state') not in FINISHED_STATES), # Anything not finished
+                    "total": Count(),
+                })
+                return counts["active"], counts["total"]
+
+            results = await fan_out(
+                Call("version", version),
+                Call("downloads", lambda: transfers("/api/v0/transfers/downloads"), optional=True, default=(0, 0)),
+                Call("uploads", lambda: transfers("/api/v0/transfers/uploads"), optional=True, default=(0, 0)),
+            )
+            dl_active, dl_total = results["downloads"]
+            ul_active, ul_total = results["uploads"]
 
             report["data"] = {
-                "version": version_str,
+                "version": results["version"],
                 "downloads": {
                     "active": dl_active,
                     "total": dl_total
@@ -53,3 +58,13 @@ def build_summary(cfg: SlskdConfig, net: NetworkConfig) -> Dict[str, Any]:
     except Exception as e:
         report.update({"status": "down", "reason": str(e)})
     return report
+
+
+async def probe_async(cfg: SlskdConfig, net: NetworkConfig, timeout: float) -> Dict[str, Any]:
+    async with pooled_client(net, str(cfg.url).rstrip("/"), headers={"X-API-Key": cfg.api_key}) as c:
+        return await probe(c, cfg, "/health", timeout)
+
+
+def build_summary(cfg: SlskdConfig, net: NetworkConfig) -> Dict[str, Any]:
+    # Sync shim for callers outside the collector loop
+    return run_sync(build_summary_async(cfg, net))
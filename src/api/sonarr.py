@@ -1,47 +1,65 @@
-import httpx
 from typing import Dict, Any
 from config.schema import SonarrConfig, NetworkConfig
+from .fanout import Call, fan_out
+from .httpclient import pooled_client, get_json
+from .probe import probe
+from .runtime import run_sync
 
-def build_summary(cfg: SonarrConfig, net: NetworkConfig) -> Dict[str, Any]:
+async def build_summary_async(cfg: SonarrConfig, net: NetworkConfig) -> Dict[str, Any]:
     report = {"name": cfg.name, "status": "healthy", "reason": None}
     params = {"apikey": cfg.api_key}
     base = f"{str(cfg.url).rstrip('/')}/api/v3"
 
     try:
-        with httpx.Client(base_url=base, verify=False, timeout=net.timeout) as c:
-            # System Status
-            status = c.get("/system/status", params=params).json()
-            # Queue
-            queue = c.get("/queue", params=params).json()
-            queue_count = len(queue.get('records', [])) if isinstance(queue, dict) else len(queue)
+        async with pooled_client(net, base) as c:
             # Missing
-            missing_count = 0
-            try:
-                wanted = c.get("/wanted/missing", params={**params, "pageSize": 1, "page": 1}).json()
-                missing_count = wanted.get('totalRecords', 0)
-            except: pass
+            async def missing_count():
+                wanted = await get_json(c, "/wanted/missing", params={**params, "pageSize": 1, "page": 1})
+                return wanted.get('totalRecords', 0)
             # History
-            last_grab = "None"
-            try:
-                hist = c.get("/history", params={**params, "pageSize": 1, "page": 1, "sortKey": "date", "sortDir": "desc"}).json()
+            async def last_grab():
+                hist = await get_json(c, "/history", params={**params, "pageSize": 1, "page": 1, "sortKey": "date", "sortDir": "desc"})
                 records = hist.get('records', [])
-                if records:
-                     last_grab = records[0].get('sourceTitle', 'Unknown')
-            except: pass
+                return records[0].get('sourceTitle', 'Unknown') if records else "None"
+            # Queue: paged on current versions, so only the total is asked for; older ones return a bare list
+            async def queue_count():
+                queue = await get_json(c, "/queue", params={**params, "pageSize": 1, "page": 1})
+                return queue.get('totalRecords', 0) if isinstance(queue, dict) else len(queue)
             # Health
-            try:
-                health = c.get("/health", params=params).json()
-                errors = [h['message'] for h in health if h['type'] == 'Error']
-                if errors:
-                    report.update({"status": "warning", "reason": f"{len(errors)} Errors: {errors[0]}..."})
-            except: pass
+            async def health_errors():
+                health = await get_json(c, "/health", params=params)
+                return [h['message'] for h in health if h['type'] == 'Error']
+
+            # All five calls are independent, so they run concurrently
+            results = await fan_out(
+                Call("status", lambda: get_json(c, "/system/status", ttl=3600, params=params)), # Version rarely changes
+                Call("queue_count", queue_count),
+                Call("missing_count", missing_count, optional=True, default=0),
+                Call("last_grab", last_grab, optional=True, default="None"),
+                Call("health_errors", health_errors, optional=True, default=[]),
+            )
+            status = results["status"]
+
+            errors = results["health_errors"]
+            if errors:
+                report.update({"status": "warning", "reason": f"{len(errors)} Errors: {errors[0]}..."})
 
             report["data"] = {
                 "version": status.get("version"),
-                "queued_items": queue_count,
-                "missing_content_count": missing_count,
-                "latest_grab": last_grab
+                "queued_items": results["queue_count"],
+                "missing_content_count": results["missing_count"],
+                "latest_grab": results["last_grab"]
             }
     except Exception as e:
         report.update({"status": "down", "reason": str(e)})
     return report
+
+
+async def probe_async(cfg: SonarrConfig, net: NetworkConfig, timeout: float) -> Dict[str, Any]:
+    async with pooled_client(net, f"{str(cfg.url).rstrip('/')}/api/v3") as c:
+        return await probe(c, cfg, "/system/status", timeout, params={"apikey": cfg.api_key})
+
+
+def build_summary(cfg: SonarrConfig, net: NetworkConfig) -> Dict[str, Any]:
+    # Sync shim for callers outside the collector loop
+    return run_sync(build_summary_async(cfg, net))
@@ -0,0 +1,72 @@
+from array import array
+from bisect import bisect_left
+from itertools import accumulate
+from typing import Dict, Iterable, Mapping, Optional, Sequence, Tuple
+
+
+def _prefix(values: Iterable[float]) -> array:
+    # P[k] = sum of the first k values, so any suffix sum is P[n] - P[lo]
+    return array("d", accumulate(values, initial=0.0))
+
+
+def _quantile(ordered: Sequence[float], q: float) -> float:
+    # Linear interpolation between closest ranks (same as numpy's default)
+    pos = (len(ordered) - 1) * q
+    lo = int(pos)
+    hi = min(lo + 1, len(ordered) - 1)
+    return ordered[lo] + (ordered[hi] - ordered[lo]) * (pos - lo)
+
+
+class ResultColumns:
+    # Speed test results held as typed columns sorted by time.
+    # Prefix sums are built once, so each extra window costs one bisect plus the percentile sorts.
+    def __init__(self, rows: Iterable[Tuple[float, float, float, float]]):
+        rows = sorted(rows)
+        self.time = array("d", (r[0] for r in rows))
+        self.download = array("d", (r[1] for r in rows))
+        self.upload = array("d", (r[2] for r in rows))
+        self.ping = array("d", (r[3] for r in rows))
+
+        self._download_sum = _prefix(self.download)
+        self._upload_sum = _prefix(self.upload)
+        self._ping_sum = _prefix(self.ping)
+        # Jitter: mean absolute change between consecutive pings
+        self._jitter_sum = _prefix(abs(b - a) for a, b in zip(self.ping, self.ping[1:]))
+
+    def __len__(self) -> int:
+        return len(self.time)
+
+    def start(self, cutoff: float) -> int:
+        # Index of the first result at or after cutoff
+        return bisect_left(self.time, cutoff)
+
+    def summarize(self, cutoffs: Mapping[str, float], min_download: Optional[float] = None) -> Dict[str, Optional[dict]]:
+        # Stats for every window ending now, keyed like `cutoffs`; None for an empty window
+        n = len(self)
+        below_sum = _prefix(1.0 if v < min_download else 0.0 for v in self.download) if min_download is not None else None
+
+        out = {}
+        for name, cutoff in cutoffs.items():
+            lo = self.start(cutoff)
+            count = n - lo
+            if count == 0:
+                out[name] = None
+                continue
+
+            download = sorted(self.download[lo:])
+            upload = sorted(self.upload[lo:])
+            ping = sorted(self.ping[lo:])
+            stats = {
+                "count": count,
+                "download_mean": (self._download_sum[n] - self._download_sum[lo]) / count,
+                "upload_mean": (self._upload_sum[n] - self._upload_sum[lo]) / count,
+                "ping_mean": (self._ping_sum[n] - self._ping_sum[lo]) / count,
+                "jitter": (self._jitter_sum[n - 1] - self._jitter_sum[lo]) / (count - 1) if count > 1 else 0.0,
+            }
+            for label, ordered in (("download", download), ("upload", upload), ("ping", ping)):
+                for q in (5, 50, 95):
+                    stats[f"{label}_p{q}"] = _quantile(ordered, q / 100)
+            if below_sum is not None:
+                stats["below_threshold"] = int(below_sum[n] - below_sum[lo])
+            out[name] = stats
+        return out
@@ -1,106 +1,178 @@
-import httpx
-import statistics
+import re
+import time
+import asyncio
 import urllib.parse
-from typing import Dict, Any
-from datetime import datetime, timedelta
+from typing import Dict, Any, List, Optional, Tuple
+from datetime import datetime
 from dateutil import parser
 from config.schema import SpeedtestTrackerConfig, NetworkConfig
+from src.store.speedtest import SpeedtestStore
+from .httpclient import pooled_client
+from .probe import probe
+from .speedtest_stats import ResultColumns
+from .runtime import run_sync
+from src.tracing import span
 
-def build_summary(cfg: SpeedtestTrackerConfig, net: NetworkConfig) -> Dict[str, Any]:
+# Result pages (25 results each) fetched per run at most
+MAX_PAGES = 50
+
+_store: Optional[SpeedtestStore] = None
+
+def get_store() -> SpeedtestStore:
+    global _store
+    if _store is None:
+        _store = SpeedtestStore()
+    return _store
+
+def window_seconds(window: str) -> int:
+    # "24h" -> 86400, "7d" -> 604800
+    value, unit = re.fullmatch(r"(\d+)([hd])", window).groups()
+    return int(value) * (3600 if unit == "h" else 86400)
+
+def parse_time(value: str) -> float:
+    # fromisoformat covers the tracker's timestamps and is far cheaper than dateutil
+    try:
+        dt = datetime.fromisoformat(value)
+    except ValueError:
+        dt = parser.parse(value)
+    # Naive timestamps are taken as local time
+    return dt.timestamp()
+
+def parse_result(item) -> tuple:
+    # Parse Values (Handle Bytes -> Bits conversion)
+    # Try for explicit bits field (exists in newer API versions)
+    if 'download_bits' in item:
+        dl_bits = float(item['download_bits'])
+        ul_bits = float(item['upload_bits'])
+    else:
+        # Fallback: API provided Bytes, we need Bits
+        dl_bits = float(item.get("download") or 0) * 8
+        ul_bits = float(item.get("upload") or 0) * 8
+
+    ping = float(item.get("ping") or 0)
+    return (parse_time(item['created_at']), dl_bits, ul_bits, ping)
+
+async def fetch_until(c, params: Dict[str, str], floor: float, pages: int) -> Tuple[List[tuple], int, Optional[Dict[str, str]], bool]:
+    # Walk result pages newest first, starting at `params`, until a result at or below `floor`.
+    # Returns the results above the floor, pages used, the query of the next page if the page
+    # limit was hit first (None once the floor or the last page is reached), and False on an API error.
+    results = []
+    for used in range(1, pages + 1):
+        r = await c.get("/api/v1/results", params=params)
+        if r.status_code != 200:
+            return results, used, params, False
+
+        json_resp = r.json()
+        items = json_resp.get('data', [])
+        if not items:
+            return results, used, None, True
+
+        batch_oldest = None
+        with span("parse results", "decode", items=len(items)):
+            for item in items:
+                try:
+                    result = parse_result(item)
+                except:
+                    continue
+                batch_oldest = result[0]
+                if result[0] > floor:
+                    results.append(result)
+        # CHECK if we reached what we already have
+        if batch_oldest and batch_oldest <= floor:
+            return results, used, None, True
+        # PREPARE NEXT PAGE
+        next_link = json_resp.get('links', {}).get('next')
+        if not next_link:
+            return results, used, None, True
+        # Extract params from the URL provided by the server, flattened (parse_qs returns lists)
+        query = urllib.parse.parse_qs(urllib.parse.urlparse(next_link).query)
+        params = {k: v[0] for k, v in query.items()}
+    return results, pages, params, True
+
+async def build_summary_async(cfg: SpeedtestTrackerConfig, net: NetworkConfig) -> Dict[str, Any]:
     report = {"name": cfg.name, "status": "healthy", "reason": None}
     headers = {"Authorization": f"Bearer {cfg.api_key}", "Accept": "application/json"}
-    
-    # We need 7 days of history. 
-    # API forces pagination (25 items/page), loop until we reach this date.
-    target_date = datetime.now().replace(tzinfo=None) - timedelta(days=7)
-    
-    all_results = []
-    
+    source = str(cfg.url).rstrip("/")
+    store = get_store()
+
+    now = time.time()
+    windows = {w: window_seconds(w) for w in cfg.windows}
+    keep_seconds = max([cfg.history_days * 86400, *windows.values()])
+
+    # Only fetch results newer than the last one stored. First run back-fills history.
+    # API forces pagination (25 items/page); at most MAX_PAGES are fetched per run. If that is not
+    # enough to reach the stored results, the gap is remembered and filled in on the next runs.
+    watermark, gap = await asyncio.to_thread(lambda: (store.watermark(source), store.gap(source)))
+    target = watermark if watermark is not None else now - keep_seconds
+
     try:
-        with httpx.Client(base_url=str(cfg.url).rstrip("/"), headers=headers, verify=False, timeout=net.timeout) as c:
-
-            current_params = {"sort": "-created_at"}
-            # Safety: Limit database to 50 pages to avoid fetching too much
-            for _ in range(50):
-                r = c.get("/api/v1/results", params=current_params)
-                
-                if r.status_code != 200:
-                    break # Stop if API errors
-                
-                json_resp = r.json()
-                items = json_resp.get('data', [])
-                
-                if not items:
-                    break # Stop if empty
-                
-                batch_oldest = None
-                
-                for item in items:
-                    try:
-                        # Parse Time (Naive for comparison)
-                        dt = parser.parse(item['created_at']).replace(tzinfo=None)
-                        batch_oldest = dt
-                        # Parse Values (Handle Bytes -> Bits conversion)
-                        # Try for explicit bits field (exists in newer API versions)
-                        if 'download_bits' in item:
-                            dl_bits = float(item['download_bits'])
-                            ul_bits = float(item['upload_bits'])
-                        else:
-                            # Fallback: API provided Bytes, we need Bits
-                            dl_bits = float(item.get("download") or 0) * 8
-                            ul_bits = float(item.get("upload") or 0) * 8
-                        
-                        ping = float(item.get("ping") or 0)
-                        
-                        all_results.append({
-                            "time": dt,
-                            "download": dl_bits,
-                            "upload": ul_bits,
-                            "ping": ping
-                        })
-                    except:
-                        continue
-                # CHECK if we reached our target date
-                if batch_oldest and batch_oldest < target_date:
-                    break 
-                # PREPARE NEXT PAGE
-                next_link = json_resp.get('links', {}).get('next')
-                if not next_link:
-                    break
-                # Extract params from the URL provided by the server
-                parsed = urllib.parse.urlparse(next_link)
-                query = urllib.parse.parse_qs(parsed.query)
-                # Flatten params (parse_qs returns lists)
-                current_params = {k: v[0] for k, v in query.items()}
+        async with pooled_client(net, source, headers=headers) as c:
+            fresh, used, cursor, ok = await fetch_until(c, {"sort": "-created_at"}, target, MAX_PAGES)
+            older = []
+            if ok and cursor is not None:
+                # Page limit hit: results between the target (or an older open gap) and the oldest fetched are missing
+                high = min((r[0] for r in fresh), default=now)
+                gap = (gap[0] if gap else target, high, cursor)
+            elif ok and gap is not None and used < MAX_PAGES:
+                # Carry on filling the gap left by an earlier run. Newer results arriving in the meantime
+                # only push older ones to later pages, so resuming re-reads a few results rather than skipping any.
+                low, high, resume = gap
+                older, _, resume, filled = await fetch_until(c, resume, low, MAX_PAGES - used)
+                if filled:
+                    gap = None if resume is None else (low, min((r[0] for r in older), default=high), resume)
+
+            # UPDATE STORE, then compute every window locally.
+            # Nothing is stored after an API error on the newest pages: the whole batch is retried next run.
+            def sync_store():
+                if ok:
+                    store.add(source, fresh + older)
+                    store.set_gap(source, gap)
+                store.prune(source, now - keep_seconds)
+                return store.since(source, now - max(windows.values()))
+            all_results = await asyncio.to_thread(sync_store)
+
             # CALCULATE STATS
             if not all_results:
-                report["data"] = {"24h_avg": "No Data", "7d_avg": "No Data"}
+                report["data"] = {f"{w}_avg": "No Data" for w in windows}
                 return report
 
-            now = datetime.now().replace(tzinfo=None)
-            cutoff_24h = now - timedelta(hours=24)
-            cutoff_7d = now - timedelta(days=7)
-
-            list_24h = [x for x in all_results if x['time'] >= cutoff_24h]
-            list_7d = [x for x in all_results if x['time'] >= cutoff_7d]
-
-            def calc_avg(items):
-                if not items: return None
-                avg_dl = statistics.mean([i['download'] for i in items]) / 1_000_000
-                avg_ul = statistics.mean([i['upload'] for i in items]) / 1_000_000
-                avg_ping = statistics.mean([i['ping'] for i in items])
-                
-                return {
-                    "download": f"{avg_dl:.2f} Mbps",
-                    "upload": f"{avg_ul:.2f} Mbps",
-                    "ping": f"{avg_ping:.2f} ms"
+            columns = ResultColumns(all_results)
+            min_download = cfg.min_download_mbps * 1_000_000 if cfg.min_download_mbps is not None else None
+            stats = columns.summarize({w: now - seconds for w, seconds in windows.items()}, min_download)
+
+            def format_stats(st):
+                if st is None: return None
+                mbps = lambda v: f"{v / 1_000_000:.2f}"
+                summary = {
+                    "download": f"{mbps(st['download_mean'])} Mbps",
+                    "upload": f"{mbps(st['upload_mean'])} Mbps",
+                    "ping": f"{st['ping_mean']:.2f} ms",
+                    "download_p5/p50/p95": f"{mbps(st['download_p5'])} / {mbps(st['download_p50'])} / {mbps(st['download_p95'])} Mbps",
+                    "upload_p5/p50/p95": f"{mbps(st['upload_p5'])} / {mbps(st['upload_p50'])} / {mbps(st['upload_p95'])} Mbps",
+                    "ping_p5/p50/p95": f"{st['ping_p5']:.2f} / {st['ping_p50']:.2f} / {st['ping_p95']:.2f} ms",
+                    "jitter": f"{st['jitter']:.2f} ms",
+                    "samples": st["count"]
                 }
+                if "below_threshold" in st:
+                    summary["below_threshold"] = f"{st['below_threshold']} of {st['count']}"
+                return summary
 
             report["data"] = {
-                "24h_avg": calc_avg(list_24h) or "No Data (24h)",
-                "7d_avg": calc_avg(list_7d) or "No Data (7d)"
+                f"{w}_avg": format_stats(stats[w]) or f"No Data ({w})"
+                for w in windows
             }
 
     except Exception as e:
         report.update({"status": "down", "reason": str(e)})
     return report
+
+
+async def probe_async(cfg: SpeedtestTrackerConfig, net: NetworkConfig, timeout: float) -> Dict[str, Any]:
+    headers = {"Authorization": f"Bearer {cfg.api_key}", "Accept": "application/json"}
+    async with pooled_client(net, str(cfg.url).rstrip("/"), headers=headers) as c:
+        return await probe(c, cfg, "/api/healthcheck", timeout)
+
+
+def build_summary(cfg: SpeedtestTrackerConfig, net: NetworkConfig) -> Dict[str, Any]:
+    # Sync shim for callers outside the collector loop
+    return run_sync(build_summary_async(cfg, net))
@@ -0,0 +1,113 @@
+import codecs
+from json import JSONDecoder, JSONDecodeError
+from typing import Any, AsyncIterator, Callable, Dict, Iterator, Optional, Tuple
+
+import httpx
+
+_decoder = JSONDecoder()
+_WS = " \t\r\n"
+_DELIMITERS = _WS + ",:]}"
+
+
+class ItemStream:
+    # Incremental parser for one JSON array, yielding each element as soon as it is complete.
+    # Only the current element and the unread tail of the last chunk are held in memory.
+    def __init__(self):
+        self.buf = ""
+        self.pos = 0
+        self.state = "start" # start -> array -> done
+
+    def feed(self, text: str, final: bool = False) -> Iterator[Any]:
+        self.buf = self.buf[self.pos:] + text
+        self.pos = 0
+        while self.state != "done":
+            self._skip("," if self.state == "array" else "")
+            if self.pos >= len(self.buf):
+                break
+            ch = self.buf[self.pos]
+
+            if self.state == "start":
+                if ch != "[":
+                    raise JSONDecodeError("Expected a JSON array", self.buf, self.pos)
+                self.state = "array"
+                self.pos += 1
+
+            elif self.state == "array":
+                if ch == "]":
+                    self.state = "done"
+                    break
+                value = self._value(self.pos, final)
+                if value is None:
+                    break
+                item, self.pos = value
+                yield item
+
+        if final and self.state != "done":
+            raise JSONDecodeError("Unexpected end of JSON document", self.buf, self.pos)
+
+    def _skip(self, extra: str):
+        chars = _WS + extra
+        while self.pos < len(self.buf) and self.buf[self.pos] in chars:
+            self.pos += 1
+
+    def _value(self, start: int, final: bool) -> Optional[Tuple[Any, int]]:
+        # Decode one value at `start`; None means the chunk ended inside it
+        try:
+            value, end = _decoder.raw_decode(self.buf, start)
+        except JSONDecodeError:
+            if final:
+                raise
+            return None
+        # A bare number cut off by the chunk boundary ("4.5e" of "4.5e3") may still be growing,
+        # so only trust a value once the delimiter after it has arrived
+        if not final and (end >= len(self.buf) or self.buf[end] not in _DELIMITERS):
+            return None
+        return value, end
+
+
+async def iter_items(response: httpx.Response) -> AsyncIterator[Any]:
+    # Yield the elements of a streamed JSON array response without reading the whole body
+    parser = ItemStream()
+    text = codecs.getincrementaldecoder(response.encoding or "utf-8")(errors="replace")
+    async for chunk in response.aiter_bytes():
+        for item in parser.feed(text.decode(chunk)):
+            yield item
+    for item in parser.feed(text.decode(b"", final=True), final=True):
+        yield item
+
+
+# Aggregators: each folds one record at a time and keeps only its running result
+
+class Count:
+    def __init__(self, where: Callable[[Any], bool] = None):
+        self.where = where
+        self.result = 0
+
+    def add(self, item):
+        if self.where is None or self.where(item):
+            self.result += 1
+
+
+class Collect:
+    # Keep (projected) records matching `where`; for small subsets of a large list
+    def __init__(self, where: Callable[[Any], bool], project: Callable[[Any], Any] = lambda x: x):
+        self.where = where
+        self.project = project
+        self.result = []
+
+    def add(self, item):
+        if self.where(item):
+            self.result.append(self.project(item))
+
+
+async def fold_json(c: httpx.AsyncClient, url: str, aggregators: Dict[str, Any], **kwargs) -> Dict[str, Any]:
+    # Stream a JSON list from `url` through `aggregators` and return {name: aggregator.result}.
+    # The list itself is never materialized:
+    #   await fold_json(c, "/transfers", {"total": Count(), "done": Count(lambda t: t["state"] == "Completed")})
+    # Only for unpaged lists: on a paged endpoint it would fold the first page alone.
+    async with c.stream("GET", url, **kwargs) as r:
+        r.raise_for_status()
+        async for item in iter_items(r):
+            for agg in aggregators.values():
+                agg.add(item)
+    return {name: agg.result for name, agg in aggregators.items()}
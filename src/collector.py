@@ -0,0 +1,193 @@
+import time
+import asyncio
+import logging
+from types import ModuleType
+from typing import Any, Dict, List, NamedTuple, Optional, Sequence
+
+from src.api.progress import Progress, current_progress, step
+from src.api.runtime import run_sync
+from src.metrics import collector_duration, current_service
+from src.tracing import set_track, span
+from src.isolation import WorkerPool, get_pool
+
+logger = logging.getLogger("HomelabScheduler")
+
+# Statuses of a collector that could not reach its service
+FAILED_STATUSES = ("down", "error", "timeout")
+
+
+class Check(NamedTuple):
+    # One service instance to collect, as handed over by run_report_job
+    kind: str # config.yaml key, e.g. "sonarr"; shared by every instance of that service
+    module: ModuleType
+    config: Any
+
+
+def _timeout_result(svc_cfg, budget: float, progress: Progress) -> Dict[str, Any]:
+    reason = f"Timed out after {budget:g}s, {progress.describe()}"
+    logger.error(f"{svc_cfg.name}: {reason}")
+    return {"name": svc_cfg.name, "status": "timeout", "reason": reason}
+
+
+async def _build(module: ModuleType, svc_cfg, net) -> Dict[str, Any]:
+    try:
+        build_async = getattr(module, "build_summary_async", None)
+        with span("build_summary", "collector", service=svc_cfg.name):
+            if build_async is not None:
+                data = await build_async(svc_cfg, net)
+            else:
+                # Sync shim: modules without an async variant run in a worker thread
+                data = await asyncio.to_thread(module.build_summary, svc_cfg, net)
+        logger.info(f"{svc_cfg.name} checked.")
+        return data
+    except Exception as exc:
+        logger.error(f"{svc_cfg.name} generated an exception: {exc}")
+        return {"name": svc_cfg.name, "status": "error", "reason": str(exc)}
+
+
+async def _probe(probe_async, svc_cfg, net, timeout: float) -> Dict[str, Any]:
+    try:
+        with span("probe", "collector", service=svc_cfg.name):
+            # One request under its own timeout; the bound here also covers connection pool waits
+            return await asyncio.wait_for(probe_async(svc_cfg, net, timeout), timeout * 2)
+    except asyncio.TimeoutError:
+        return {"name": svc_cfg.name, "status": "down", "reason": f"No response within {timeout:g}s"}
+    except Exception as exc:
+        logger.error(f"{svc_cfg.name} probe generated an exception: {exc}")
+        return {"name": svc_cfg.name, "status": "error", "reason": str(exc)}
+
+
+async def _check(module: ModuleType, svc_cfg, net, probe_timeout: Optional[float], full: bool) -> Dict[str, Any]:
+    # Probe first when the module has one: a service that is down is reported at once,
+    # instead of its full summary running into timeouts and retries
+    probe_async = getattr(module, "probe_async", None)
+    if probe_timeout and probe_async is not None:
+        with step("probe"):
+            result = await _probe(probe_async, svc_cfg, net, probe_timeout)
+        if not full or result["status"] == "down":
+            if result["status"] == "down":
+                logger.warning(f"{svc_cfg.name} is unreachable, skipped: {result['reason']}")
+            return result
+    return await _build(module, svc_cfg, net)
+
+
+async def _isolated(pool: WorkerPool, module: ModuleType, svc_cfg, net, probe_timeout: Optional[float], full: bool) -> Dict[str, Any]:
+    with step("collector process"):
+        return await pool.run(module, svc_cfg, net, probe_timeout, full)
+
+
+async def _collect_one(module: ModuleType, svc_cfg, net, limit: asyncio.Semaphore,
+                       progress: Progress, budget: Optional[float], pool: Optional[WorkerPool] = None,
+                       probe_timeout: Optional[float] = None, full: bool = True) -> Dict[str, Any]:
+    current_progress.set(progress)
+    current_service.set(svc_cfg.name)
+    set_track(svc_cfg.name)
+    async with limit:
+        progress.started = True
+        start = time.perf_counter()
+        if pool is None:
+            work = asyncio.create_task(_check(module, svc_cfg, net, probe_timeout, full))
+        else:
+            work = asyncio.create_task(_isolated(pool, module, svc_cfg, net, probe_timeout, full))
+        try:
+            done, _ = await asyncio.wait({work}, timeout=budget)
+        except asyncio.CancelledError:
+            work.cancel()
+            raise
+        if not done:
+            # Describe where it was stuck before cancelling unwinds it
+            result = _timeout_result(svc_cfg, budget, progress)
+            work.cancel()
+        else:
+            result = work.result()
+        collector_duration.observe(time.perf_counter() - start, service=svc_cfg.name, status=result.get("status"))
+        return result
+
+
+async def collect_async(checks: Sequence[Check], net, collection, tier: str = "summary") -> List[Dict[str, Any]]:
+    # tier "summary": full summaries, gated by a probe if enabled; tier "probe": liveness only
+    full = tier == "summary"
+    probe_timeout = collection.probe_timeout if collection.probe or not full else None
+    if not checks:
+        return []
+    pool, budget, concurrency = None, collection.service_budget, collection.max_concurrency
+    if collection.isolation == "process":
+        # Every collector gets a hard deadline: on expiry its process is killed, not just cancelled
+        pool = get_pool()
+        pool.ensure(collection.workers)
+        budget = budget or collection.worker_deadline
+        concurrency = min(concurrency, collection.workers)
+    limit = asyncio.Semaphore(concurrency)
+    progress = [Progress() for _ in checks]
+    tasks = [
+        asyncio.create_task(_collect_one(check.module, check.config, net, limit, prog, budget, pool, probe_timeout, full))
+        for check, prog in zip(checks, progress)
+    ]
+
+    # Whole-job budget: whatever hasn't finished by then is reported as a timeout
+    done, pending = await asyncio.wait(tasks, timeout=collection.job_budget)
+    report = [
+        task.result() if task in done else _timeout_result(check.config, collection.job_budget, prog)
+        for task, check, prog in zip(tasks, checks, progress)
+    ]
+    for task in pending:
+        task.cancel()
+    if pending:
+        await asyncio.wait(pending, timeout=5)
+    return report
+
+
+def collect(checks: Sequence[Check], net, collection, tier: str = "summary") -> List[Dict[str, Any]]:
+    # Run every collector on the shared event loop and wait for the full report
+    return run_sync(collect_async(checks, net, collection, tier))
+
+
+def _sum_numbers(values: List[Any]) -> Any:
+    # Add up matching numeric leaves across instances; text and lists have no total
+    if all(isinstance(v, dict) for v in values):
+        keys = dict.fromkeys(k for v in values for k in v)
+        totals = {k: _sum_numbers([v[k] for v in values if k in v]) for k in keys}
+        return {k: v for k, v in totals.items() if v is not None and v != {}} or None
+    if all(isinstance(v, (int, float)) and not isinstance(v, bool) for v in values):
+        return sum(values)
+    return None
+
+
+def group_instances(checks: Sequence[Check], report: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    # Sort the report by name, keeping instances of the same service together under a totals row.
+    # `report` is in the same order as `checks`.
+    by_kind: Dict[str, List[Dict[str, Any]]] = {}
+    for check, result in zip(checks, report):
+        by_kind.setdefault(check.kind, []).append(result)
+
+    rows = []
+    for kind, results in by_kind.items():
+        if len(results) == 1:
+            rows.append(((results[0]["name"], 1, results[0]["name"]), results[0]))
+            continue
+        title = kind.replace("_", " ").title()
+        for result in results:
+            result["group"] = kind
+            rows.append(((title, 1, result["name"]), result))
+
+        unhealthy = [r["name"] for r in results if r["status"] != "healthy"]
+        if not unhealthy:
+            status = "healthy"
+        else:
+            # Down only when no instance is up at all; warnings alone keep the group up
+            status = "down" if all(r["status"] in FAILED_STATUSES for r in results) else "warning"
+        totals = {
+            "name": f"{title} (all instances)",
+            "status": status,
+            "reason": f"Not healthy: {', '.join(unhealthy)}" if unhealthy else None,
+            "data": {
+                "instances": len(results),
+                **(_sum_numbers([r["data"] for r in results if r["status"] in ("healthy", "warning") and r.get("data")]) or {}),
+            },
+            "group": kind,
+            "totals": True,
+        }
+        rows.append(((title, 0, ""), totals))
+
+    rows.sort(key=lambda row: row[0])
+    return [result for _, result in rows]
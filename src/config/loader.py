@@ -1,50 +1,159 @@
 import os
 import re
+import time
 import yaml
+import hashlib
 import logging
+import threading
 from pathlib import Path
-from dotenv import load_dotenv
+from typing import Callable, Dict, Optional, Tuple
+from dotenv import find_dotenv, dotenv_values
 from .schema import AppConfig
 
 # Logging setup
 logger = logging.getLogger(__name__)
 
-def load_config(custom_path: str = None) -> AppConfig:
-    load_dotenv()
+# ${VAR} or ${VAR:default}
+variable_pattern = re.compile(r'\$\{([^}^:]+)(?::([^}]*))?\}')
+
 
+def config_path(custom_path: str = None) -> Path:
     # 1. Explicit Argument or Environment Variable (Docker)
     path_str = custom_path or os.getenv("CONFIG_PATH")
 
     if path_str:
-        config_path = Path(path_str)
-    else:
-        # 2. Fallback: Local Development Path
-        config_path = Path(__file__).resolve().parents[2] / "config" / "config.yaml"
-
-    # Validation
-    if not config_path.exists() or not config_path.is_file():
-        raise FileNotFoundError(
-            f"Config file not found at: {config_path}\n"
-            f"Current working dir: {os.getcwd()}"
-        )
+        return Path(path_str)
+    # 2. Fallback: Local Development Path
+    return Path(__file__).resolve().parents[2] / "config" / "config.yaml"
 
-    logger.info(f"Loading config from: {config_path}")
-
-    # Parsing: Read and expand variables (Keep this exactly as is)
-    variable_pattern = re.compile(r'\$\{([^}^:]+)(?::([^}]*))?\}')
 
+def parse_config(raw_content: str, path: Path) -> AppConfig:
+    # Parsing: Read and expand variables
     def expand_vars(match):
         env_var = match.group(1)
         default_val = match.group(2) if match.group(2) is not None else match.group(0)
         return os.getenv(env_var, default_val)
 
-    with open(config_path, "r") as f:
-        raw_content = f.read()
-
     expanded_content = variable_pattern.sub(expand_vars, raw_content)
-    
+
     try:
         config_data = yaml.safe_load(expanded_content)
         return AppConfig(**config_data)
     except yaml.YAMLError as e:
-        raise ValueError(f"Error parsing YAML file at {config_path}: {e}")
\ No newline at end of file
+        raise ValueError(f"Error parsing YAML file at {path}: {e}")
+
+
+class ConfigManager:
+    # Caches the validated AppConfig and only re-parses when the file or an env var it uses changes.
+    # Cheap checks first: file mtime/size, then a content hash, then the values of the ${VARS}
+    # the file references. .env is re-read when it changes, without overriding the real environment.
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._entries: Dict[Path, dict] = {}
+        self._failed: Dict[Path, Tuple[str, str, Exception]] = {} # Last invalid version, not retried until it changes
+        self._process_env = set(os.environ) # Real environment wins over .env, as with load_dotenv()
+        self._dotenv_stat: Optional[Tuple[int, int]] = None
+        self._watcher: Optional[threading.Thread] = None
+
+    def _load_dotenv(self):
+        path = find_dotenv()
+        if not path:
+            return
+        st = os.stat(path)
+        if (st.st_mtime_ns, st.st_size) == self._dotenv_stat:
+            return
+        self._dotenv_stat = (st.st_mtime_ns, st.st_size)
+        for key, value in dotenv_values(path).items():
+            if key not in self._process_env and value is not None:
+                os.environ[key] = value
+
+    @staticmethod
+    def _env_fingerprint(names) -> str:
+        h = hashlib.sha256()
+        for name in sorted(names):
+            h.update(f"{name}={os.environ.get(name)}\0".encode())
+        return h.hexdigest()
+
+    def get(self, custom_path: str = None) -> AppConfig:
+        with self._lock:
+            self._load_dotenv()
+            path = config_path(custom_path)
+
+            # Validation
+            if not path.exists() or not path.is_file():
+                raise FileNotFoundError(
+                    f"Config file not found at: {path}\n"
+                    f"Current working dir: {os.getcwd()}"
+                )
+
+            st = path.stat()
+            stat = (st.st_mtime_ns, st.st_size)
+            entry = self._entries.get(path)
+            if entry is not None and entry["stat"] == stat:
+                if self._env_fingerprint(entry["vars"]) == entry["env"]:
+                    return entry["config"]
+                raw_content = entry["raw"]
+            else:
+                raw_content = path.read_text()
+
+            digest = hashlib.sha256(raw_content.encode()).hexdigest()
+            names = {m.group(1) for m in variable_pattern.finditer(raw_content)}
+            env = self._env_fingerprint(names)
+            if entry is not None and entry["hash"] == digest and entry["env"] == env:
+                # Touched but unchanged
+                entry["stat"] = stat
+                return entry["config"]
+
+            failed = self._failed.get(path)
+            if failed is not None and failed[:2] == (digest, env):
+                raise failed[2]
+
+            logger.info(f"Loading config from: {path}")
+            try:
+                config = parse_config(raw_content, path)
+            except Exception as e:
+                self._failed[path] = (digest, env, e)
+                raise
+            self._failed.pop(path, None)
+            self._entries[path] = {"stat": stat, "hash": digest, "vars": names, "env": env,
+                                   "raw": raw_content, "config": config}
+            return config
+
+    def watch(self, on_change: Callable[[AppConfig], None], interval: float = 30, custom_path: str = None):
+        # Poll for changes in a daemon thread and call on_change(new_config) after each reload.
+        # An invalid edit is logged and the last good config stays in place.
+        if self._watcher is not None:
+            return
+        current = self.get(custom_path)
+
+        def poll():
+            nonlocal current
+            last_error = None
+            while True:
+                time.sleep(interval)
+                try:
+                    config = self.get(custom_path)
+                except Exception as e:
+                    # Logged once per distinct error, not on every poll
+                    if str(e) != last_error:
+                        logger.error(f"Config reload failed, keeping the previous config: {e}")
+                    last_error = str(e)
+                    continue
+                last_error = None
+                if config is not current:
+                    current = config
+                    try:
+                        on_change(config)
+                    except Exception as e:
+                        logger.error(f"Config change handler failed: {e}")
+
+        self._watcher = threading.Thread(target=poll, name="config-watcher", daemon=True)
+        self._watcher.start()
+
+
+# Process-wide, shared by the scheduler and every job
+config_manager = ConfigManager()
+
+
+def load_config(custom_path: str = None) -> AppConfig:
+    return config_manager.get(custom_path)
@@ -1,5 +1,5 @@
 from __future__ import annotations
-from typing import Optional
+from typing import Annotated, Literal, Optional
 from pydantic import BaseModel, EmailStr, AnyUrl, Field, ConfigDict
 
 # Helpers / base service models
@@ -34,17 +34,74 @@ class EmailConfig(BaseModel):
 
 class NetworkConfig(BaseModel):
     timeout: int = Field(ge=1)
-    retries: int = Field(ge=0)
+    retries: int = Field(ge=0) # Extra attempts for idempotent GETs
+    retry_backoff: float = Field(default=0.5, ge=0) # Base delay in seconds, doubled per attempt (with jitter)
+    retry_max_backoff: float = Field(default=10, ge=0)
+    # Circuit breaker per service, remembered across scheduled runs
+    breaker_threshold: int = Field(default=3, ge=1) # Consecutive failures before failing fast
+    breaker_cooldown: float = Field(default=300, ge=0) # Seconds before a trial request is allowed
+    # Pooled HTTP clients (shared across scheduled runs)
+    max_connections_per_host: int = Field(default=10, ge=1)
+    keepalive_expiry: float = Field(default=60, ge=0) # Seconds an idle keep-alive connection stays open
+    idle_timeout: float = Field(default=900, ge=0) # Seconds before an unused client is closed
+
+class HistoryConfig(BaseModel):
+    enabled: bool = True
+    raw_days: int = Field(default=14, ge=1) # Full resolution samples, hourly averages after that
+    retention_days: int = Field(default=365, ge=1)
+
+class CacheConfig(BaseModel):
+    enabled: bool = True
+    max_entries: int = Field(default=512, ge=1) # In-memory LRU size
+    disk: bool = False # Also keep responses under DATA_DIR so they survive restarts
+
+class MetricsConfig(BaseModel):
+    enabled: bool = False # Serve Prometheus metrics while the scheduler runs
+    host: str = "0.0.0.0"
+    port: int = Field(default=9108, ge=1, le=65535)
+
+class TracingConfig(BaseModel):
+    enabled: bool = False # Write a Chrome/Perfetto trace of every run to DATA_DIR/traces
+    keep: int = Field(default=20, ge=1) # Runs kept on disk
+    profile: bool = False # Also cProfile the collectors (.prof + .txt next to the trace)
+    profile_top: int = Field(default=40, ge=1) # Functions listed in the .txt summary
+
+class MonitorConfig(BaseModel):
+    enabled: bool = False # Check services every `interval` seconds and email when a status changes
+    interval: int = Field(default=60, ge=10) # Seconds between checks
+    debounce: int = Field(default=2, ge=1) # Consecutive checks a new status must hold before it is alerted
+    flap_threshold: int = Field(default=4, ge=2) # Status changes within flap_window that count as flapping
+    flap_window: int = Field(default=3600, ge=60) # Seconds; alerts pause while flapping, resume once stable this long
+    services: list[str] | None = None # Service names to watch (default: every configured service)
+    tier: Literal["probe", "summary"] = "probe" # "probe" only checks reachability; "summary" builds full summaries
+
+class CollectionConfig(BaseModel):
+    max_concurrency: int = Field(default=8, ge=1) # Collectors allowed in flight at once
+    job_budget: float | None = Field(default=None, gt=0) # Wall-clock seconds for the whole collection
+    service_budget: float | None = Field(default=None, gt=0) # Wall-clock seconds per collector
+    # "process" runs each collector in a worker process that is killed if it overruns its deadline
+    isolation: Literal["none", "process"] = "none"
+    workers: int = Field(default=4, ge=1) # Worker processes kept for process isolation
+    worker_deadline: float = Field(default=300, gt=0) # Hard deadline per collector when no service_budget is set
+    probe: bool = True # Probe each service first and skip the full summary of unreachable ones
+    probe_timeout: float = Field(default=3, gt=0) # Seconds a probe may take before the service counts as down
 
 # Services
 class ProxmoxConfig(NamedService):
     host: AnyUrl
     api_token: str
     password: str | None = None
+    rrd: bool = False # 24h per-node trends from RRD data
+    storage_forecast: bool = True
+    storage_window_days: int = Field(default=14, ge=1) # Usage history the days-to-full fit is based on
+    storage_horizon_days: int = Field(default=14, ge=0) # Warn when a pool is projected to fill within this many days
 
 class PortainerConfig(UrlService):
     token: str
-    environment: int
+    environment: int | None = None # Single environment (kept for older configs)
+    environments: list[int] | None = None # Environment IDs to collect; every Docker environment when neither is set
+    endpoints_ttl: int = Field(default=600, ge=0) # Seconds the environment list is cached
+    concurrency: int = Field(default=4, ge=1) # Environments queried at once
 
 class GluetunConfig(UrlService):
     api_key: str | None = None
@@ -55,6 +112,9 @@ class AdGuardConfig(UrlService):
 
 class SpeedtestTrackerConfig(ApiKeyService):
     api_key: str
+    windows: list[Annotated[str, Field(pattern=r"^\d+[hd]$")]] = Field(default_factory=lambda: ["24h", "7d"], min_length=1) # e.g. "24h", "30d"
+    history_days: int = Field(default=90, ge=1) # Results kept in the local store
+    min_download_mbps: float | None = Field(default=None, gt=0) # Count results below this speed
 
 class ProwlarrConfig(ApiKeyService):
     pass
@@ -85,22 +145,31 @@ class JellyseerrConfig(ApiKeyService):
 
 # Master app config
 class AppConfig(BaseModel):
+    # Unknown top-level sections are kept for plugin services (see src/api/plugins.py)
+    model_config = ConfigDict(extra="allow")
     # top-level sections
     schedule: ScheduleConfig
     email: EmailConfig
     network: NetworkConfig
-    # services
-    proxmox: ProxmoxConfig
-    portainer: PortainerConfig
-    gluetun: GluetunConfig
-    adguard: AdGuardConfig
-    speedtest_tracker: SpeedtestTrackerConfig
-    prowlarr: ProwlarrConfig
-    sonarr: SonarrConfig
-    radarr: RadarrConfig
-    lidarr: LidarrConfig
-    bazarr: BazarrConfig
-    qbittorrent: QbittorrentConfig
-    slskd: SlskdConfig
-    jellyfin: JellyfinConfig
-    jellyseerr: JellyseerrConfig
\ No newline at end of file
+    collection: CollectionConfig = Field(default_factory=CollectionConfig)
+    history: HistoryConfig = Field(default_factory=HistoryConfig)
+    cache: CacheConfig = Field(default_factory=CacheConfig)
+    metrics: MetricsConfig = Field(default_factory=MetricsConfig)
+    tracing: TracingConfig = Field(default_factory=TracingConfig)
+    monitor: MonitorConfig = Field(default_factory=MonitorConfig)
+    # services: each is optional, leave a section out to skip that service.
+    # A section may also be a list to collect several instances (each needs its own name).
+    proxmox: Optional[ProxmoxConfig | list[ProxmoxConfig]] = None
+    portainer: Optional[PortainerConfig | list[PortainerConfig]] = None
+    gluetun: Optional[GluetunConfig | list[GluetunConfig]] = None
+    adguard: Optional[AdGuardConfig | list[AdGuardConfig]] = None
+    speedtest_tracker: Optional[SpeedtestTrackerConfig | list[SpeedtestTrackerConfig]] = None
+    prowlarr: Optional[ProwlarrConfig | list[ProwlarrConfig]] = None
+    sonarr: Optional[SonarrConfig | list[SonarrConfig]] = None
+    radarr: Optional[RadarrConfig | list[RadarrConfig]] = None
+    lidarr: Optional[LidarrConfig | list[LidarrConfig]] = None
+    bazarr: Optional[BazarrConfig | list[BazarrConfig]] = None
+    qbittorrent: Optional[QbittorrentConfig | list[QbittorrentConfig]] = None
+    slskd: Optional[SlskdConfig | list[SlskdConfig]] = None
+    jellyfin: Optional[JellyfinConfig | list[JellyfinConfig]] = None
+    jellyseerr: Optional[JellyseerrConfig | list[JellyseerrConfig]] = None
@@ -1,56 +1,154 @@
 import os
+import time
+import random
 import smtplib
 import ssl
+import threading
 from email.mime.text import MIMEText
 from email.mime.multipart import MIMEMultipart
-from jinja2 import Environment, FileSystemLoader
+from pathlib import Path
+from typing import Optional, Tuple
+from jinja2 import Environment, FileSystemLoader, FileSystemBytecodeCache
 from datetime import datetime
-from dotenv import load_dotenv
+from src.store import data_dir
+from src.store.outbox import Outbox
+from src.metrics import email_duration, emails
+from src.tracing import span
 
-load_dotenv()
+# Delivery retries: exponential backoff with jitter, then give up on messages this old
+RETRY_BASE = 60
+RETRY_MAX = 3600
+MAX_AGE = 3 * 86400
+# Seconds any single SMTP step (connect, TLS, each command) may take, so a stalled server cannot
+# hold the delivery lock, and with it the outbox and report jobs, indefinitely
+SMTP_TIMEOUT = 30
 
-# Configuration from environment variables
-SMTP_HOST = os.getenv("SMTP_HOST")
-SMTP_PORT = int(os.getenv("SMTP_PORT", 587))
-SMTP_USER = os.getenv("SMTP_USER")
-SMTP_PASS = os.getenv("SMTP_PASS")
-EMAIL_FROM = os.getenv("EMAIL_FROM")
-EMAIL_TO = os.getenv("EMAIL_TO")
+# Templates live next to this module, whatever the working directory
+TEMPLATE_DIR = Path(__file__).resolve().parent
+
+_env: Optional[Environment] = None
+
+def get_environment() -> Environment:
+    # One environment per process: compiled templates stay in its cache between sends,
+    # and the bytecode cache under DATA_DIR spares the compile after a restart
+    global _env
+    if _env is None:
+        cache_dir = data_dir() / "jinja_cache"
+        cache_dir.mkdir(exist_ok=True)
+        _env = Environment(loader=FileSystemLoader(TEMPLATE_DIR), bytecode_cache=FileSystemBytecodeCache(str(cache_dir)))
+    return _env
+
+def render_report(report_data, now: Optional[datetime] = None) -> Tuple[str, str, str]:
+    # (subject, text, html) from the same report model
+    now = now or datetime.now()
+    env = get_environment()
+    context = {"services": report_data, "date": now.strftime("%Y-%m-%d %H:%M")}
+    subject = f"Homelab Report - {now.strftime('%Y-%m-%d')}"
+    with span("render template", "email", services=len(report_data)):
+        return subject, env.get_template("template.txt").render(**context), env.get_template("template.html").render(**context)
 
 def send_report(report_data):
-    #Renders HTML template with the report data and sends it.
-    if not all([SMTP_HOST, SMTP_USER, SMTP_PASS, EMAIL_FROM, EMAIL_TO]):
+    #Renders the report as plain text and HTML and sends it.
+    # 1. Render plain text and HTML
+    subject, text_content, html_content = render_report(report_data)
+    queue_email(subject, text_content, html_content)
+
+def send_alerts(alerts, now: Optional[datetime] = None):
+    # Status change alerts from the monitor: one short plain-text email per check that had any
+    now = now or datetime.now()
+    changed = ", ".join(f"{a.name} {a.status.upper()}" for a in alerts)
+    subject = f"Homelab Alert - {changed}"
+    with span("render template", "email", alerts=len(alerts)):
+        text_content = get_environment().get_template("alert.txt").render(alerts=alerts, date=now.strftime("%Y-%m-%d %H:%M"))
+    queue_email(subject, text_content)
+
+def queue_email(subject: str, text_content: str, html_content: Optional[str] = None):
+    # Configuration from environment variables, read per send: .env is loaded (and reloaded) by the config manager
+    smtp_host = os.getenv("SMTP_HOST")
+    smtp_user = os.getenv("SMTP_USER")
+    smtp_pass = os.getenv("SMTP_PASS")
+    email_from = os.getenv("EMAIL_FROM")
+    email_to = os.getenv("EMAIL_TO")
+
+    if not all([smtp_host, smtp_user, smtp_pass, email_from, email_to]):
         print("Email Config Missing in .env")
         return
-
-    # 1. Render HTML
-    env = Environment(loader=FileSystemLoader("src/email"))
-    template = env.get_template("template.html")
-    
-    html_content = template.render(
-        services=report_data,
-        date=datetime.now().strftime("%Y-%m-%d %H:%M")
-    )
+    # EMAIL_TO may list several recipients separated by commas
+    recipients = [addr.strip() for addr in email_to.split(",") if addr.strip()]
 
     # 2. Build Message
     msg = MIMEMultipart("alternative")
-    msg["Subject"] = f"Homelab Report - {datetime.now().strftime('%Y-%m-%d')}"
-    msg["From"] = EMAIL_FROM
-    msg["To"] = EMAIL_TO
-
-    # Attach HTML
-    msg.attach(MIMEText(html_content, "html"))
-
-    # 3. Send
-    try:
-        context = ssl.create_default_context()
-        print(f"Connecting to {SMTP_HOST}:{SMTP_PORT}...")
-        
-        with smtplib.SMTP(SMTP_HOST, SMTP_PORT) as server:
-            server.starttls(context=context)
-            server.login(SMTP_USER, SMTP_PASS)
-            server.sendmail(EMAIL_FROM, EMAIL_TO, msg.as_string())
-            
-        print("Email Sent Successfully!")
-    except Exception as e:
-        print(f"Failed to send email: {e}")
\ No newline at end of file
+    msg["Subject"] = subject
+    msg["From"] = email_from
+    msg["To"] = ", ".join(recipients)
+
+    # Attach text first: clients show the last part they can render
+    msg.attach(MIMEText(text_content, "plain"))
+    if html_content is not None:
+        msg.attach(MIMEText(html_content, "html"))
+
+    # 3. Queue, then deliver: the message is on disk before the first attempt
+    get_outbox().enqueue(email_from, recipients, msg.as_string())
+    with span("smtp delivery", "email"):
+        deliver_outbox()
+
+
+_outbox: Optional[Outbox] = None
+_delivery_lock = threading.Lock()
+
+def get_outbox() -> Outbox:
+    global _outbox
+    if _outbox is None:
+        _outbox = Outbox()
+    return _outbox
+
+def _retry_at(attempts: int) -> float:
+    return time.time() + random.uniform(0.5, 1) * min(RETRY_MAX, RETRY_BASE * 2 ** attempts)
+
+def deliver_outbox() -> int:
+    # Send every due message over one authenticated SMTP session, returning how many went out.
+    # Called after each report and periodically by the scheduler; a no-op when nothing is due.
+    with _delivery_lock:
+        outbox = get_outbox()
+        for expired in outbox.expire(time.time() - MAX_AGE):
+            print(f"Dropping queued email #{expired.id} after {expired.attempts} attempts: {expired.last_error}")
+        pending = outbox.due()
+        if not pending:
+            return 0
+
+        smtp_host = os.getenv("SMTP_HOST")
+        smtp_port = int(os.getenv("SMTP_PORT", 587))
+        sent = handled = 0
+        start = time.perf_counter()
+        try:
+            context = ssl.create_default_context()
+            print(f"Connecting to {smtp_host}:{smtp_port}...")
+
+            with smtplib.SMTP(smtp_host, smtp_port, timeout=SMTP_TIMEOUT) as server:
+                server.starttls(context=context)
+                server.login(os.getenv("SMTP_USER"), os.getenv("SMTP_PASS"))
+                for message in pending:
+                    try:
+                        # One transaction per message, however many recipients it has
+                        server.sendmail(message.sender, message.recipients, message.message)
+                    except smtplib.SMTPServerDisconnected:
+                        raise
+                    except smtplib.SMTPException as e:
+                        outbox.failed(message.id, str(e), _retry_at(message.attempts))
+                        print(f"Failed to send queued email #{message.id}, will retry: {e}")
+                    else:
+                        outbox.delivered(message.id)
+                        sent += 1
+                    handled += 1
+        except Exception as e:
+            # Session-level failure (connect, TLS, login, disconnect): retry whatever is left later
+            for message in pending[handled:]:
+                outbox.failed(message.id, str(e), _retry_at(message.attempts))
+            print(f"Failed to send email, {len(pending) - handled} message(s) queued for retry: {e}")
+
+        email_duration.observe(time.perf_counter() - start)
+        emails.inc(sent, result="sent")
+        emails.inc(len(pending) - sent, result="failed")
+        if sent:
+            print(f"Email Sent Successfully! ({sent} message(s))")
+        return sent
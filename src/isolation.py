@@ -0,0 +1,145 @@
+import json
+import asyncio
+import logging
+import importlib
+import multiprocessing
+from typing import Any, Dict, List, Optional
+
+logger = logging.getLogger("HomelabScheduler")
+
+# Fresh interpreters: nothing is inherited from the scheduler's threads, locks or event loop
+_context = multiprocessing.get_context("spawn")
+
+
+def _encode(obj: Any) -> bytes:
+    return json.dumps(obj, separators=(",", ":"), default=str).encode()
+
+
+def _model_ref(model) -> Dict[str, Any]:
+    # Pydantic config as plain JSON plus where its class lives, rebuilt on the other side
+    cls = type(model)
+    return {"type": f"{cls.__module__}:{cls.__qualname__}", "data": model.model_dump(mode="json")}
+
+
+def _load_model(ref: Dict[str, Any]):
+    module, _, name = ref["type"].partition(":")
+    return getattr(importlib.import_module(module), name).model_validate(ref["data"])
+
+
+def _serve(conn):
+    # Worker process main loop: one collector at a time, for as long as the parent keeps the worker.
+    # The event loop (and with it pooled clients and caches) lives across tasks.
+    from src.collector import _check
+
+    loop = asyncio.new_event_loop()
+    asyncio.set_event_loop(loop)
+    while True:
+        try:
+            task = json.loads(conn.recv_bytes())
+        except (EOFError, OSError):
+            break # Parent closed the pipe
+        try:
+            module = importlib.import_module(task["module"])
+            svc_cfg = _load_model(task["config"])
+            net = _load_model(task["net"])
+            result = loop.run_until_complete(_check(module, svc_cfg, net, task["probe_timeout"], task["full"]))
+        except Exception as e:
+            result = {"name": task["config"]["data"].get("name"), "status": "error", "reason": f"Worker failed: {e}"}
+        conn.send_bytes(_encode(result))
+
+
+class Worker:
+    def __init__(self):
+        self.conn, child = _context.Pipe()
+        self.process = _context.Process(target=_serve, args=(child,), name="collector-worker", daemon=True)
+        self.process.start()
+        child.close()
+
+    async def run(self, payload: bytes) -> Dict[str, Any]:
+        # Wait for the reply without a thread: the pipe is watched by the event loop
+        loop = asyncio.get_running_loop()
+        ready = loop.create_future()
+        fd = self.conn.fileno()
+        loop.add_reader(fd, lambda: ready.done() or ready.set_result(None))
+        try:
+            self.conn.send_bytes(payload)
+            await ready
+        finally:
+            loop.remove_reader(fd)
+        return json.loads(self.conn.recv_bytes())
+
+    def kill(self):
+        self.process.kill()
+        self.process.join(5)
+        self.conn.close()
+
+    def close(self):
+        # Closing the pipe ends the worker's loop
+        self.conn.close()
+        self.process.join(5)
+        if self.process.is_alive():
+            self.process.kill()
+            self.process.join(5)
+
+
+class WorkerPool:
+    # Long-lived collector processes. A task that overruns its deadline (or is cancelled) gets
+    # its worker killed, whatever it is stuck in, and a fresh worker takes its place.
+    # Only used from the collector loop, so no locking is needed.
+    def __init__(self):
+        self._idle: List[Worker] = []
+        self.size = 0
+
+    def ensure(self, size: int):
+        # Spawn up front so interpreter start-up is not charged to the first collectors' deadlines
+        self.size = size
+        while len(self._idle) < size:
+            self._idle.append(Worker())
+        while len(self._idle) > size:
+            self._idle.pop().close()
+
+    def _release(self, worker: Worker):
+        if len(self._idle) < self.size:
+            self._idle.append(worker)
+        else:
+            worker.close()
+
+    async def run(self, module, svc_cfg, net, probe_timeout: Optional[float] = None, full: bool = True) -> Dict[str, Any]:
+        worker = self._idle.pop() if self._idle else Worker()
+        payload = _encode({"module": module.__name__, "config": _model_ref(svc_cfg), "net": _model_ref(net),
+                           "probe_timeout": probe_timeout, "full": full})
+        try:
+            result = await worker.run(payload)
+        except asyncio.CancelledError:
+            logger.warning(f"{svc_cfg.name}: killing collector process {worker.process.pid}")
+            worker.kill()
+            self._release(Worker())
+            raise
+        except (EOFError, OSError):
+            worker.kill()
+            self._release(Worker())
+            reason = f"Collector process exited unexpectedly (exit code {worker.process.exitcode})"
+            logger.error(f"{svc_cfg.name}: {reason}")
+            return {"name": svc_cfg.name, "status": "error", "reason": reason}
+        self._release(worker)
+        return result
+
+    def close(self):
+        workers, self._idle = self._idle, []
+        for worker in workers:
+            worker.close()
+
+
+_pool: Optional[WorkerPool] = None
+
+
+def get_pool() -> WorkerPool:
+    global _pool
+    if _pool is None:
+        _pool = WorkerPool()
+    return _pool
+
+
+def close_pool():
+    if _pool is not None:
+        _pool.close()
@@ -1,10 +1,9 @@
 import sys
 import os
 import json
-import concurrent.futures
+import time
 import logging
 from pathlib import Path
-from dotenv import load_dotenv
 from apscheduler.schedulers.blocking import BlockingScheduler
 from apscheduler.triggers.cron import CronTrigger
 
@@ -16,15 +15,20 @@ if str(root_dir) not in sys.path:
     sys.path.append(str(root_dir))
 
 #Import custom modules
-from src.config.loader import load_config
-from src.email.sender import send_report
-
-# Import service modules
-from src.api import (
-    adguard, bazarr, gluetun, jellyfin, jellyseerr, 
-    lidarr, portainer, prowlarr, proxmox, 
-    qbittorrent, radarr, slskd, sonarr, speedtest_tracker
-)
+from src.config.loader import load_config, config_manager
+from src.email.sender import send_report, deliver_outbox
+from src.collector import collect, group_instances
+from src.store.history import HistoryStore, annotate_changes
+from src.api.httpclient import close_clients
+from src.api.cache import response_cache
+from src.api.runtime import run_sync
+from src.isolation import close_pool
+from src.monitor import run_monitor_check
+from src.metrics import metrics, job_duration, job_last_success
+from src.tracing import RunTrace, span
+
+# Service modules are imported on demand, only for services enabled in config.yaml
+from src.api.plugins import services
 
 # Setup basic logging for the scheduler
 logging.basicConfig(
@@ -38,68 +42,67 @@ logger = logging.getLogger("HomelabScheduler")
 def run_report_job(): 
     # Main report logic to be called by the scheduler
     logger.info("--Starting Daily Homelab Report--")
-    load_dotenv()
+    config_start = time.perf_counter()
     
     try:
+        # Cached: only re-read and re-validated when config.yaml, .env or a referenced env var changed
         cfg = load_config()
+        # Map config objects to their service modules
+        checks = services.enabled(cfg)
     except Exception as e:
         logger.error(f"Configuration Error: {e}")
         return
 
-    # Map config objects to their summary building functions
-    checks = [
-        (adguard.build_summary, cfg.adguard, cfg.network),
-        (bazarr.build_summary, cfg.bazarr, cfg.network),
-        (gluetun.build_summary, cfg.gluetun, cfg.network),
-        (jellyfin.build_summary, cfg.jellyfin, cfg.network),
-        (jellyseerr.build_summary, cfg.jellyseerr, cfg.network),
-        (lidarr.build_summary, cfg.lidarr, cfg.network),
-        (portainer.build_summary, cfg.portainer, cfg.network),
-        (prowlarr.build_summary, cfg.prowlarr, cfg.network),
-        (proxmox.build_summary, cfg.proxmox, cfg.network),
-        (qbittorrent.build_summary, cfg.qbittorrent, cfg.network),
-        (radarr.build_summary, cfg.radarr, cfg.network),
-        (slskd.build_summary, cfg.slskd, cfg.network),
-        (sonarr.build_summary, cfg.sonarr, cfg.network),
-        (speedtest_tracker.build_summary, cfg.speedtest_tracker, cfg.network),
-    ]
-
-    report = []
-
-    # Run summary building functions concurrently
-    with concurrent.futures.ThreadPoolExecutor() as executor:
-        # Submit all tasks
-        future_to_service = {
-            executor.submit(func, c_cfg, n_cfg): c_cfg.name 
-            for func, c_cfg, n_cfg in checks
-        }
-
-        # Process results at completion
-        for future in concurrent.futures.as_completed(future_to_service):
-            service_name = future_to_service[future]
-            # Error handling for individual services
+    # Per-run trace file (and profile) when enabled in config; spans are no-ops otherwise
+    run_trace = RunTrace(cfg.tracing, origin=config_start) if cfg.tracing.enabled else None
+    if run_trace is not None:
+        run_trace.trace.complete("load config", "config", config_start, time.perf_counter(), 1)
+    try:
+        _report(cfg, checks)
+    finally:
+        if run_trace is not None:
             try:
-                data = future.result()
-                report.append(data)
-                logger.info(f"{service_name} checked.")
-            except Exception as exc:
-                logger.error(f"{service_name} generated an exception: {exc}")
-                report.append({
-                    "name": service_name, 
-                    "status": "error", 
-                    "reason": str(exc)
-                })
-
-    # Sort report alphabetically by service name
-    report.sort(key=lambda x: x['name'])
+                run_trace.finish()
+            except Exception as e:
+                logger.error(f"Failed to write trace: {e}")
+
+def _report(cfg, checks):
+    response_cache.configure(cfg.cache)
+    if not checks:
+        logger.warning("No services are enabled in config.yaml; the report will be empty")
+    job_start = time.perf_counter()
+
+    # Run summary building functions concurrently on the shared event loop
+    with span("collect", "job", services=len(checks)):
+        report = collect(checks, cfg.network, cfg.collection)
+    job_duration.observe(time.perf_counter() - job_start, stage="collect")
+
+    # Sort report alphabetically by service name, with instances of one service grouped under their totals
+    report = group_instances(checks, report)
+
+    # Compare against earlier runs, then keep this one
+    if cfg.history.enabled:
+        try:
+            with span("history", "job"):
+                history = HistoryStore()
+                annotate_changes(report, history)
+                history.record(report)
+                history.compact(cfg.history.raw_days, cfg.history.retention_days)
+        except Exception as e:
+            logger.error(f"History store error: {e}")
 
     # 3. Emailing
     logger.info("Generating Email...")
+    email_start = time.perf_counter()
     try:
-        send_report(report)
-        logger.info("Done! Report sent successfully.")
+        with span("send_report", "email"):
+            send_report(report)
+        logger.info("Done! Report delivered or queued for retry.")
+        job_last_success.set(time.time())
     except Exception as e:
         logger.error(f"Failed to send email: {e}")
+    job_duration.observe(time.perf_counter() - email_start, stage="email")
+    job_duration.observe(time.perf_counter() - job_start, stage="total")
 
 # 3. Scheduler
 if __name__ == "__main__":
@@ -123,9 +126,53 @@ if __name__ == "__main__":
     # 3. Add the job using the Cron string from config
     scheduler.add_job(
         run_report_job, 
-        CronTrigger.from_crontab(cron_schedule, timezone=user_timezone)
+        CronTrigger.from_crontab(cron_schedule, timezone=user_timezone),
+        id="report"
     )
 
+    # 3.2. Retry queued emails that could not be delivered yet (no connection when nothing is due)
+    scheduler.add_job(deliver_outbox, "interval", seconds=60, id="outbox")
+
+    # 3.3. Apply schedule edits to config.yaml without a restart
+    def apply_schedule(cfg):
+        global cron_schedule, user_timezone
+        if (cfg.schedule.time, cfg.schedule.timezone) == (cron_schedule, user_timezone):
+            return
+        scheduler.reschedule_job("report", trigger=CronTrigger.from_crontab(cfg.schedule.time, timezone=cfg.schedule.timezone))
+        cron_schedule, user_timezone = cfg.schedule.time, cfg.schedule.timezone
+        logger.info(f"Schedule changed: {cron_schedule} ({user_timezone})")
+
+    # 3.3.1. Continuous monitoring between daily reports: alerts on status changes only
+    def apply_monitor(cfg):
+        job = scheduler.get_job("monitor")
+        if not cfg.monitor.enabled:
+            if job is not None:
+                scheduler.remove_job("monitor")
+                logger.info("Monitoring stopped.")
+            return
+        if job is None:
+            scheduler.add_job(run_monitor_check, "interval", seconds=cfg.monitor.interval, id="monitor",
+                              max_instances=1, coalesce=True)
+            logger.info(f"Monitoring every {cfg.monitor.interval}s.")
+        elif job.trigger.interval.total_seconds() != cfg.monitor.interval:
+            scheduler.reschedule_job("monitor", trigger="interval", seconds=cfg.monitor.interval)
+            logger.info(f"Monitoring interval changed: {cfg.monitor.interval}s")
+
+    apply_monitor(init_config)
+
+    def on_config_change(cfg):
+        apply_schedule(cfg)
+        apply_monitor(cfg)
+
+    config_manager.watch(on_config_change)
+
+    # 3.4. Prometheus endpoint for collector, HTTP, job and email metrics
+    if init_config.metrics.enabled:
+        try:
+            metrics.serve(init_config.metrics.host, init_config.metrics.port)
+        except OSError as e:
+            logger.error(f"Metrics server failed to start: {e}")
+
     # 4. Run once immediately on startup (Verification)
     logger.info("Running immediate startup check...")
     run_report_job()
@@ -136,4 +183,7 @@ if __name__ == "__main__":
     try:
         scheduler.start()
     except (KeyboardInterrupt, SystemExit):
-        logger.info("Scheduler stopped.")
\ No newline at end of file
+        logger.info("Scheduler stopped.")
+    finally:
+        run_sync(close_clients())
+        close_pool()
\ No newline at end of file
@@ -0,0 +1,139 @@
+import time
+import logging
+import threading
+from collections import deque
+from dataclasses import dataclass, field
+from typing import Any, Deque, Dict, List, Optional
+
+from src.config.loader import load_config
+from src.collector import collect
+from src.api.cache import response_cache
+from src.api.plugins import services
+from src.email.sender import send_alerts
+from src.tracing import profile_lock
+
+logger = logging.getLogger("HomelabScheduler")
+
+
+@dataclass
+class Alert:
+    kind: str # "changed", "flapping" (alerts paused) or "settled" (alerts resumed)
+    name: str
+    status: str
+    previous: Optional[str] = None
+    reason: Optional[str] = None
+    previous_for: Optional[str] = None # How long the previous status lasted, e.g. "3h 12m"
+    transitions: int = 0
+    window: Optional[str] = None
+
+
+@dataclass
+class ServiceState:
+    status: str # Last confirmed status
+    reason: Optional[str]
+    since: float
+    pending: Optional[str] = None # A different status seen, not yet held for `debounce` checks
+    pending_count: int = 0
+    transitions: Deque[float] = field(default_factory=deque) # Confirmed changes within the flap window
+    flapping: bool = False
+
+
+def _duration(seconds: float) -> str:
+    minutes = int(seconds // 60)
+    if minutes < 60:
+        return f"{minutes}m"
+    hours, minutes = divmod(minutes, 60)
+    return f"{hours}h {minutes}m" if hours < 48 else f"{hours // 24}d {hours % 24}h"
+
+
+class StatusMonitor:
+    # Last known status per service, kept in memory between checks.
+    # A new status only counts once it has been seen on `debounce` consecutive checks.
+    # A service changing `flap_threshold` times within `flap_window` is flapping: one alert says so,
+    # further changes are muted, and alerts resume once it has held one status for a whole window.
+    def __init__(self):
+        self.states: Dict[str, ServiceState] = {}
+        self._lock = threading.Lock()
+
+    def observe(self, report: List[Dict[str, Any]], cfg, now: Optional[float] = None) -> List[Alert]:
+        now = now or time.time()
+        alerts = []
+        with self._lock:
+            for result in report:
+                name, status, reason = result["name"], result["status"], result.get("reason")
+                state = self.states.get(name)
+                if state is None:
+                    # First sight is the baseline, not a change
+                    self.states[name] = ServiceState(status, reason, now)
+                    continue
+                while state.transitions and now - state.transitions[0] > cfg.flap_window:
+                    state.transitions.popleft()
+
+                if status == state.status:
+                    state.pending, state.pending_count, state.reason = None, 0, reason
+                else:
+                    if status != state.pending:
+                        state.pending, state.pending_count = status, 0
+                    state.pending_count += 1
+                    if state.pending_count >= cfg.debounce:
+                        alert = Alert("changed", name, status, state.status, reason, _duration(now - state.since))
+                        state.status, state.reason, state.since = status, reason, now
+                        state.pending, state.pending_count = None, 0
+                        state.transitions.append(now)
+                        if state.flapping:
+                            logger.info(f"{name}: {alert.previous} -> {status} (flapping, not alerted)")
+                        elif len(state.transitions) >= cfg.flap_threshold:
+                            state.flapping = True
+                            alerts.append(Alert("flapping", name, status, reason=reason, transitions=len(state.transitions),
+                                                window=_duration(cfg.flap_window)))
+                        else:
+                            alerts.append(alert)
+
+                if state.flapping and not state.transitions:
+                    state.flapping = False
+                    alerts.append(Alert("settled", name, state.status, reason=state.reason))
+
+            # Services dropped from the config are forgotten
+            names = {result["name"] for result in report}
+            for name in set(self.states) - names:
+                del self.states[name]
+        return alerts
+
+
+# Process-wide; state lives as long as the scheduler
+monitor = StatusMonitor()
+
+
+def run_monitor_check():
+    # High-frequency check between daily reports: collect, compare with the last known status, alert on changes.
+    # By default only the probes run, so a check costs one request per service.
+    try:
+        cfg = load_config()
+        checks = services.enabled(cfg)
+    except Exception as e:
+        logger.error(f"Configuration Error: {e}")
+        return
+    if cfg.monitor.services is not None:
+        unknown = set(cfg.monitor.services) - {check.config.name for check in checks}
+        if unknown:
+            logger.warning(f"monitor.services names no enabled service: {', '.join(sorted(unknown))}")
+        checks = [check for check in checks if check.config.name in cfg.monitor.services]
+    if not checks:
+        return
+
+    response_cache.configure(cfg.cache)
+    # Never run into the next check: whatever is still running then is reported as a timeout
+    budget = min(cfg.collection.job_budget or cfg.monitor.interval, cfg.monitor.interval)
+    # Waits for a report run being profiled to finish, so this check stays out of its profile
+    with profile_lock:
+        report = collect(checks, cfg.network, cfg.collection.model_copy(update={"job_budget": budget}), cfg.monitor.tier)
+
+    alerts = monitor.observe(report, cfg.monitor)
+    if not alerts:
+        return
+    for alert in alerts:
+        logger.warning(f"Status alert for {alert.name}: {alert.kind}, now {alert.status}")
+    try:
+        send_alerts(alerts)
+    except Exception as e:
+        logger.error(f"Failed to send alert email: {e}")
@@ -0,0 +1,11 @@
+import os
+from pathlib import Path
+
+
+def data_dir() -> Path:
+    # Persistent state (result stores, caches, queues) lives here.
+    # 1. Environment Variable (Docker), 2. Fallback: Local Development Path
+    path_str = os.getenv("DATA_DIR")
+    path = Path(path_str) if path_str else Path(__file__).resolve().parents[2] / "data"
+    path.mkdir(parents=True, exist_ok=True)
+    return path
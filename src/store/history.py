@@ -0,0 +1,134 @@
+import sqlite3
+import time
+from contextlib import closing
+from pathlib import Path
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+from . import data_dir
+
+DAY = 86400
+
+# Status is stored like any other metric so availability can be trended too
+STATUS_VALUES = {"healthy": 0, "warning": 1}
+
+
+def flatten_metrics(data: Any, prefix: str = "") -> Iterator[Tuple[str, float]]:
+    # Numeric leaves of a service's data dict, with dotted names ("containers.running")
+    if isinstance(data, dict):
+        for key, value in data.items():
+            yield from flatten_metrics(value, f"{prefix}{key}.")
+    elif isinstance(data, (int, float)) and not isinstance(data, bool):
+        yield prefix.rstrip("."), float(data)
+
+
+class HistoryStore:
+    # Append-only time series of every run's normalized metrics, keyed by (service, metric, ts).
+    # Old samples are downsampled to hourly averages and dropped after the retention period.
+    def __init__(self, path: Optional[Path] = None):
+        self.path = path or data_dir() / "history.sqlite3"
+        with closing(self._connect()) as db, db:
+            db.execute(
+                "CREATE TABLE IF NOT EXISTS samples ("
+                " service TEXT NOT NULL, metric TEXT NOT NULL, ts INTEGER NOT NULL, value REAL NOT NULL,"
+                " PRIMARY KEY (service, metric, ts)) WITHOUT ROWID"
+            )
+            db.execute("CREATE INDEX IF NOT EXISTS samples_service_ts ON samples (service, ts)")
+            # Compaction and retention select by age alone
+            db.execute("CREATE INDEX IF NOT EXISTS samples_ts ON samples (ts)")
+            # Raw samples before `through` have already been downsampled
+            db.execute("CREATE TABLE IF NOT EXISTS compaction (id INTEGER PRIMARY KEY CHECK (id = 1), through INTEGER NOT NULL)")
+
+    def _connect(self) -> sqlite3.Connection:
+        return sqlite3.connect(self.path, timeout=30)
+
+    def record(self, report: List[Dict[str, Any]], ts: Optional[float] = None):
+        ts = int(ts or time.time())
+        rows = []
+        for service in report:
+            name = service.get("name")
+            rows.append((name, "status", ts, STATUS_VALUES.get(service.get("status"), 2)))
+            rows.extend((name, metric, ts, value) for metric, value in flatten_metrics(service.get("data") or {}))
+        with closing(self._connect()) as db, db:
+            db.executemany("INSERT OR REPLACE INTO samples VALUES (?, ?, ?, ?)", rows)
+
+    def value_at(self, service: str, metric: str, ts: float, tolerance: float = DAY / 2) -> Optional[float]:
+        # Latest sample at or before ts, if it is no older than `tolerance`
+        with closing(self._connect()) as db:
+            row = db.execute(
+                "SELECT value FROM samples WHERE service = ? AND metric = ? AND ts <= ? AND ts >= ?"
+                " ORDER BY ts DESC LIMIT 1",
+                (service, metric, int(ts), int(ts - tolerance)),
+            ).fetchone()
+        return row[0] if row else None
+
+    def value_days_ago(self, service: str, metric: str, days: float, now: Optional[float] = None) -> Optional[float]:
+        return self.value_at(service, metric, (now or time.time()) - days * DAY)
+
+    def series(self, service: str, metric: str, since: float) -> List[Tuple[int, float]]:
+        with closing(self._connect()) as db:
+            return db.execute(
+                "SELECT ts, value FROM samples WHERE service = ? AND metric = ? AND ts >= ? ORDER BY ts",
+                (service, metric, int(since)),
+            ).fetchall()
+
+    def trend(self, service: str, metric: str, window: float, now: Optional[float] = None) -> Optional[Dict[str, float]]:
+        # Least-squares slope (per day) and summary over the last `window` seconds
+        points = self.series(service, metric, (now or time.time()) - window)
+        if len(points) < 2:
+            return None
+        n = len(points)
+        mean_t = sum(t for t, _ in points) / n
+        mean_v = sum(v for _, v in points) / n
+        var_t = sum((t - mean_t) ** 2 for t, _ in points)
+        slope = sum((t - mean_t) * (v - mean_v) for t, v in points) / var_t if var_t else 0.0
+        values = [v for _, v in points]
+        return {
+            "slope_per_day": slope * DAY,
+            "first": values[0],
+            "last": values[-1],
+            "min": min(values),
+            "max": max(values),
+            "mean": mean_v,
+        }
+
+    def compact(self, raw_days: int, retention_days: int, now: Optional[float] = None):
+        # Keep raw samples for raw_days, hourly averages until retention_days, nothing after that.
+        # Only samples that aged past the cutoff since the last run are averaged, so a run costs
+        # what crossed the cutoff, not the whole history. The cutoff is on an hour boundary,
+        # so an hour is never split between two runs.
+        now = now or time.time()
+        raw_cutoff = int(now - raw_days * DAY) // 3600 * 3600
+        with closing(self._connect()) as db, db:
+            db.execute("DELETE FROM samples WHERE ts < ?", (int(now - retention_days * DAY),))
+            row = db.execute("SELECT through FROM compaction WHERE id = 1").fetchone()
+            through = row[0] if row else None # None: never compacted, take everything before the cutoff
+            if through is not None and through >= raw_cutoff:
+                return
+            start = through if through is not None else -1
+            hourly = db.execute(
+                "SELECT service, metric, (ts / 3600) * 3600 AS bucket, AVG(value) FROM samples"
+                " WHERE ts >= ? AND ts < ? GROUP BY service, metric, bucket",
+                (start, raw_cutoff),
+            ).fetchall()
+            db.execute("DELETE FROM samples WHERE ts >= ? AND ts < ?", (start, raw_cutoff))
+            db.executemany("INSERT INTO samples VALUES (?, ?, ?, ?)", hourly)
+            db.execute("INSERT OR REPLACE INTO compaction VALUES (1, ?)", (raw_cutoff,))
+
+
+def annotate_changes(report: List[Dict[str, Any]], store: HistoryStore, now: Optional[float] = None):
+    # Attach day-over-day deltas and the 7 day trend of each numeric metric, from local history only
+    now = now or time.time()
+    for service in report:
+        changes = {}
+        for metric, value in flatten_metrics(service.get("data") or {}):
+            previous = store.value_days_ago(service["name"], metric, 1, now)
+            if previous is None or previous == value:
+                continue
+            delta = value - previous
+            change = f"{delta:+g} vs yesterday"
+            trend = store.trend(service["name"], metric, 7 * DAY, now)
+            if trend and round(trend["slope_per_day"], 1):
+                change += f" (7d trend {trend['slope_per_day']:+.1f}/day)"
+            changes[metric] = change
+        if changes:
+            service["changes"] = changes
@@ -0,0 +1,77 @@
+import json
+import time
+import sqlite3
+from contextlib import closing
+from dataclasses import dataclass
+from pathlib import Path
+from typing import List, Optional
+
+from . import data_dir
+
+
+@dataclass
+class OutgoingMessage:
+    id: int
+    created_at: float
+    sender: str
+    recipients: List[str]
+    message: str # Fully rendered RFC 5322 message
+    attempts: int
+    last_error: Optional[str]
+
+
+class Outbox:
+    # Rendered emails are written here before any delivery attempt, so an SMTP outage
+    # delays a report instead of losing it. Rows are deleted once delivered.
+    def __init__(self, path: Optional[Path] = None):
+        self.path = path or data_dir() / "outbox.sqlite3"
+        with closing(self._connect()) as db, db:
+            db.execute(
+                "CREATE TABLE IF NOT EXISTS messages ("
+                " id INTEGER PRIMARY KEY AUTOINCREMENT, created_at REAL NOT NULL,"
+                " sender TEXT NOT NULL, recipients TEXT NOT NULL, message TEXT NOT NULL,"
+                " attempts INTEGER NOT NULL DEFAULT 0, next_attempt_at REAL NOT NULL, last_error TEXT)"
+            )
+
+    def _connect(self) -> sqlite3.Connection:
+        return sqlite3.connect(self.path, timeout=30)
+
+    def enqueue(self, sender: str, recipients: List[str], message: str, now: Optional[float] = None) -> int:
+        now = now or time.time()
+        with closing(self._connect()) as db, db:
+            cur = db.execute(
+                "INSERT INTO messages (created_at, sender, recipients, message, next_attempt_at) VALUES (?, ?, ?, ?, ?)",
+                (now, sender, json.dumps(recipients), message, now),
+            )
+            return cur.lastrowid
+
+    def due(self, now: Optional[float] = None) -> List[OutgoingMessage]:
+        # Oldest first, so reports go out in the order they were written
+        with closing(self._connect()) as db:
+            rows = db.execute(
+                "SELECT id, created_at, sender, recipients, message, attempts, last_error FROM messages"
+                " WHERE next_attempt_at <= ? ORDER BY id",
+                (now or time.time(),),
+            ).fetchall()
+        return [OutgoingMessage(r[0], r[1], r[2], json.loads(r[3]), r[4], r[5], r[6]) for r in rows]
+
+    def delivered(self, message_id: int):
+        with closing(self._connect()) as db, db:
+            db.execute("DELETE FROM messages WHERE id = ?", (message_id,))
+
+    def failed(self, message_id: int, error: str, retry_at: float):
+        with closing(self._connect()) as db, db:
+            db.execute(
+                "UPDATE messages SET attempts = attempts + 1, next_attempt_at = ?, last_error = ? WHERE id = ?",
+                (retry_at, error, message_id),
+            )
+
+    def expire(self, cutoff: float) -> List[OutgoingMessage]:
+        # Drop messages queued before `cutoff` and return them for logging
+        with closing(self._connect()) as db, db:
+            rows = db.execute(
+                "SELECT id, created_at, sender, recipients, message, attempts, last_error FROM messages WHERE created_at < ?",
+                (cutoff,),
+            ).fetchall()
+            db.execute("DELETE FROM messages WHERE created_at < ?", (cutoff,))
+        return [OutgoingMessage(r[0], r[1], r[2], json.loads(r[3]), r[4], r[5], r[6]) for r in rows]
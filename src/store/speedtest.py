@@ -0,0 +1,71 @@
+import json
+import sqlite3
+from contextlib import closing
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+from . import data_dir
+
+# (created_at epoch seconds, download bits/s, upload bits/s, ping ms)
+Result = Tuple[float, float, float, float]
+# Results between low and high (epoch seconds) not fetched yet, and the page query to carry on from
+Gap = Tuple[float, float, Dict[str, Any]]
+
+
+class SpeedtestStore:
+    # Local copy of Speedtest Tracker results so each run only has to fetch what is new.
+    # Rows are keyed by source (the tracker URL) so several trackers can share one file.
+    def __init__(self, path: Optional[Path] = None):
+        self.path = path or data_dir() / "speedtest.sqlite3"
+        with closing(self._connect()) as db, db:
+            db.execute(
+                "CREATE TABLE IF NOT EXISTS results ("
+                " source TEXT NOT NULL, created_at REAL NOT NULL,"
+                " download REAL NOT NULL, upload REAL NOT NULL, ping REAL NOT NULL,"
+                " PRIMARY KEY (source, created_at)) WITHOUT ROWID"
+            )
+            db.execute(
+                "CREATE TABLE IF NOT EXISTS gaps ("
+                " source TEXT PRIMARY KEY, low REAL NOT NULL, high REAL NOT NULL, cursor TEXT NOT NULL)"
+            )
+
+    def _connect(self) -> sqlite3.Connection:
+        return sqlite3.connect(self.path, timeout=30)
+
+    def watermark(self, source: str) -> Optional[float]:
+        # Newest result already stored for this source
+        with closing(self._connect()) as db:
+            row = db.execute("SELECT MAX(created_at) FROM results WHERE source = ?", (source,)).fetchone()
+        return row[0]
+
+    def add(self, source: str, results: Iterable[Result]):
+        with closing(self._connect()) as db, db:
+            db.executemany(
+                "INSERT OR REPLACE INTO results VALUES (?, ?, ?, ?, ?)",
+                ((source, *r) for r in results),
+            )
+
+    def gap(self, source: str) -> Optional[Gap]:
+        with closing(self._connect()) as db:
+            row = db.execute("SELECT low, high, cursor FROM gaps WHERE source = ?", (source,)).fetchone()
+        return (row[0], row[1], json.loads(row[2])) if row else None
+
+    def set_gap(self, source: str, gap: Optional[Gap]):
+        with closing(self._connect()) as db, db:
+            if gap is None:
+                db.execute("DELETE FROM gaps WHERE source = ?", (source,))
+            else:
+                low, high, cursor = gap
+                db.execute("INSERT OR REPLACE INTO gaps VALUES (?, ?, ?, ?)", (source, low, high, json.dumps(cursor)))
+
+    def since(self, source: str, cutoff: float) -> List[Result]:
+        with closing(self._connect()) as db:
+            return db.execute(
+                "SELECT created_at, download, upload, ping FROM results"
+                " WHERE source = ? AND created_at >= ? ORDER BY created_at",
+                (source, cutoff),
+            ).fetchall()
+
+    def prune(self, source: str, cutoff: float):
+        with closing(self._connect()) as db, db:
+            db.execute("DELETE FROM results WHERE source = ? AND created_at < ?", (source, cutoff))
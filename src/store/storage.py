@@ -0,0 +1,86 @@
+import sqlite3
+from contextlib import closing
+from pathlib import Path
+from typing import Dict, Iterable, Optional, Tuple
+
+from . import data_dir
+
+DAY = 86400
+# Points are stored one per hour, whatever RRD timeframe they came from
+BUCKET = 3600
+
+# (node, storage) identifies a pool; shared pools are tracked under the first node reporting them
+Pool = Tuple[str, str]
+# (ts epoch seconds, used bytes, total bytes)
+Point = Tuple[float, float, float]
+
+
+class StorageStore:
+    # Proxmox storage RRD points kept between runs, so each run only fetches what is new.
+    # Rows are keyed by source (the Proxmox host) so several clusters can share one file.
+    def __init__(self, path: Optional[Path] = None):
+        self.path = path or data_dir() / "storage.sqlite3"
+        with closing(self._connect()) as db, db:
+            db.execute(
+                "CREATE TABLE IF NOT EXISTS points ("
+                " source TEXT NOT NULL, node TEXT NOT NULL, storage TEXT NOT NULL,"
+                " ts REAL NOT NULL, used REAL NOT NULL, total REAL NOT NULL,"
+                " PRIMARY KEY (source, node, storage, ts)) WITHOUT ROWID"
+            )
+
+    def _connect(self) -> sqlite3.Connection:
+        return sqlite3.connect(self.path, timeout=30)
+
+    def watermarks(self, source: str) -> Dict[Pool, float]:
+        # Newest point already stored, per pool
+        with closing(self._connect()) as db:
+            rows = db.execute(
+                "SELECT node, storage, MAX(ts) FROM points WHERE source = ? GROUP BY node, storage", (source,)
+            ).fetchall()
+        return {(node, storage): ts for node, storage, ts in rows}
+
+    def add(self, source: str, pool: Pool, points: Iterable[Point]):
+        with closing(self._connect()) as db, db:
+            db.executemany(
+                "INSERT OR REPLACE INTO points VALUES (?, ?, ?, ?, ?, ?)",
+                ((source, *pool, ts // BUCKET * BUCKET, used, total) for ts, used, total in points),
+            )
+
+    def prune(self, source: str, cutoff: float):
+        with closing(self._connect()) as db, db:
+            db.execute("DELETE FROM points WHERE source = ? AND ts < ?", (source, cutoff))
+
+    def fit(self, source: str, since: float) -> Dict[Pool, Dict[str, float]]:
+        # Least-squares line of used bytes over time for every pool at once: the sums are
+        # accumulated by a single GROUP BY, with time taken relative to `since` for precision.
+        with closing(self._connect()) as db:
+            rows = db.execute(
+                "SELECT node, storage, COUNT(*), SUM(t), SUM(used), SUM(t * t), SUM(t * used), MAX(ts)"
+                " FROM (SELECT node, storage, ts, ts - ? AS t, used FROM points WHERE source = ? AND ts >= ?)"
+                " GROUP BY node, storage",
+                (since, source, since),
+            ).fetchall()
+            latest = {
+                (node, storage): (used, total)
+                for node, storage, used, total in db.execute(
+                    "SELECT p.node, p.storage, p.used, p.total FROM points p"
+                    " JOIN (SELECT node, storage, MAX(ts) AS ts FROM points WHERE source = ? GROUP BY node, storage) m"
+                    " ON p.node = m.node AND p.storage = m.storage AND p.ts = m.ts WHERE p.source = ?",
+                    (source, source),
+                )
+            }
+
+        fits = {}
+        for node, storage, n, sx, sy, sxx, sxy, last_ts in rows:
+            var = n * sxx - sx * sx
+            if n < 2 or var <= 0:
+                continue
+            used, total = latest[(node, storage)]
+            fits[(node, storage)] = {
+                "slope_per_day": (n * sxy - sx * sy) / var * DAY,
+                "used": used,
+                "total": total,
+                "samples": n,
+                "last_ts": last_ts,
+            }
+        return fits
@@ -0,0 +1,186 @@
+import io
+import json
+import time
+import pstats
+import cProfile
+import itertools
+import logging
+import threading
+import uuid
+from contextlib import contextmanager
+from contextvars import ContextVar
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Dict, Iterator, List, Optional
+
+from src.api.runtime import run_sync
+from src.store import data_dir
+
+logger = logging.getLogger(__name__)
+
+# httpcore trace events worth a slice of their own (connect_tcp includes the DNS lookup)
+HTTP_PHASES = {
+    "connect_tcp": "connect (DNS + TCP)",
+    "start_tls": "TLS handshake",
+    "send_request_headers": "send request",
+    "send_request_body": "send request body",
+    "receive_response_headers": "wait for server",
+    "receive_response_body": "download body",
+}
+
+
+class Trace:
+    # Spans of one report run in Chrome trace event format (chrome://tracing, ui.perfetto.dev).
+    # Timestamps are microseconds since the run started. Each collector gets its own track;
+    # HTTP calls overlap within a collector, so they are async events grouped by request.
+    def __init__(self, origin: Optional[float] = None):
+        self.origin = origin or time.perf_counter()
+        self.started_at = datetime.now()
+        self.events: List[Dict[str, Any]] = [{"ph": "M", "name": "process_name", "pid": 1, "args": {"name": "homelab-report"}}]
+        self._tracks: Dict[str, int] = {}
+        self._ids = itertools.count(1)
+        self._lock = threading.Lock()
+        self.track("job")
+
+    def _us(self, t: float) -> float:
+        return round((t - self.origin) * 1e6, 1)
+
+    def track(self, name: str) -> int:
+        with self._lock:
+            tid = self._tracks.get(name)
+            if tid is None:
+                tid = self._tracks[name] = len(self._tracks) + 1
+                self.events.append({"ph": "M", "name": "thread_name", "pid": 1, "tid": tid, "args": {"name": name}})
+        return tid
+
+    def complete(self, name: str, cat: str, start: float, end: float, tid: int, args: Optional[Dict[str, Any]] = None):
+        event = {"ph": "X", "name": name, "cat": cat, "ts": self._us(start), "dur": self._us(end) - self._us(start),
+                 "pid": 1, "tid": tid}
+        if args:
+            event["args"] = args
+        with self._lock:
+            self.events.append(event)
+
+    def begin(self, name: str, cat: str, span_id: int, tid: int, args: Optional[Dict[str, Any]] = None):
+        self._async_event("b", name, cat, span_id, tid, args)
+
+    def end(self, name: str, cat: str, span_id: int, tid: int, args: Optional[Dict[str, Any]] = None):
+        self._async_event("e", name, cat, span_id, tid, args)
+
+    def _async_event(self, ph: str, name: str, cat: str, span_id: int, tid: int, args: Optional[Dict[str, Any]]):
+        event = {"ph": ph, "name": name, "cat": cat, "id": span_id, "ts": self._us(time.perf_counter()), "pid": 1, "tid": tid}
+        if args:
+            event["args"] = args
+        with self._lock:
+            self.events.append(event)
+
+    def next_id(self) -> int:
+        return next(self._ids)
+
+    def write(self, path: Path):
+        path.write_text(json.dumps({
+            "traceEvents": self.events,
+            "displayTimeUnit": "ms",
+            "otherData": {"started_at": self.started_at.isoformat(timespec="seconds")},
+        }))
+
+
+# The run being traced, if any. Set by the report job and inherited by the collector tasks it starts
+# (run_sync hands them the caller's context), so work started elsewhere, such as a monitor check on
+# another scheduler thread, never lands in the trace. Checked first by every span.
+_active: ContextVar[Optional[Trace]] = ContextVar("active_trace", default=None)
+# Track of the collector running in this task (the job track outside collectors)
+current_track: ContextVar[int] = ContextVar("current_track", default=1)
+
+
+# Held while a run is being profiled. cProfile sees everything on the collector loop thread,
+# so other collections wait for the profiled run instead of showing up in its profile.
+profile_lock = threading.Lock()
+
+
+def active() -> Optional[Trace]:
+    return _active.get()
+
+
+@contextmanager
+def span(name: str, cat: str = "app", **args) -> Iterator[None]:
+    trace = _active.get()
+    if trace is None:
+        yield
+        return
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        trace.complete(name, cat, start, time.perf_counter(), current_track.get(), args)
+
+
+def set_track(name: str):
+    # Record the rest of the current task (a collector) on its own track
+    trace = _active.get()
+    if trace is not None:
+        current_track.set(trace.track(name))
+
+
+def http_tracer(trace: Trace):
+    # httpx `trace` request extension: one async slice per request, with its connection phases nested
+    span_id, tid = trace.next_id(), current_track.get()
+
+    async def on_event(event: str, info: Dict[str, Any]):
+        phase, _, state = event.rpartition(".")
+        name = HTTP_PHASES.get(phase.rpartition(".")[2])
+        if name is None:
+            return
+        if state == "started":
+            trace.begin(name, "http", span_id, tid)
+        else:
+            trace.end(name, "http", span_id, tid, {"failed": True} if state == "failed" else None)
+
+    return span_id, tid, on_event
+
+
+class RunTrace:
+    # Tracing (and optionally cProfile) for one report run, driven by the `tracing` config section.
+    # Created and finished on the thread running the report job.
+    def __init__(self, cfg, origin: Optional[float] = None):
+        self.cfg = cfg
+        self.trace = Trace(origin)
+        self.profiler: Optional[cProfile.Profile] = None
+        self._token = _active.set(self.trace)
+        if cfg.profile:
+            # Collectors run on the shared event loop thread; cProfile only sees the thread it was enabled in
+            profile_lock.acquire()
+            self.profiler = cProfile.Profile()
+            try:
+                run_sync(_call(self.profiler.enable))
+            except BaseException:
+                profile_lock.release()
+                raise
+
+    def finish(self) -> Path:
+        # Scheduler threads are reused: clear the trace from this one before anything can fail
+        _active.reset(self._token)
+        directory = data_dir() / "traces"
+        directory.mkdir(exist_ok=True)
+        # Unique per run, even for runs started within the same second
+        stem = f"report-{self.trace.started_at:%Y%m%d-%H%M%S}-{uuid.uuid4().hex[:6]}"
+        self.trace.write(directory / f"{stem}.json")
+        if self.profiler is not None:
+            try:
+                run_sync(_call(self.profiler.disable))
+            finally:
+                profile_lock.release()
+            self.profiler.dump_stats(directory / f"{stem}.prof")
+            text = io.StringIO()
+            pstats.Stats(self.profiler, stream=text).sort_stats("cumulative").print_stats(self.cfg.profile_top)
+            (directory / f"{stem}.txt").write_text(text.getvalue())
+        # Keep the newest `keep` runs
+        for old in sorted(directory.glob("report-*.json"))[:-self.cfg.keep]:
+            for path in directory.glob(f"{old.stem}.*"):
+                path.unlink(missing_ok=True)
+        logger.info(f"Trace written to {directory / stem}.json")
+        return directory / f"{stem}.json"
+
+
+async def _call(func):
+    func()
@@ -0,0 +1,30 @@
+from src.collector import Check, group_instances
+
+
+def grouped(*statuses):
+    checks = [Check("sonarr", None, None) for _ in statuses]
+    report = [{"name": f"Sonarr {i}", "status": status, "reason": None, "data": {"queued_items": 1}}
+              for i, status in enumerate(statuses)]
+    rows = group_instances(checks, report)
+    return next(row for row in rows if row.get("totals"))
+
+
+def test_all_healthy_group():
+    totals = grouped("healthy", "healthy")
+    assert (totals["status"], totals["reason"]) == ("healthy", None)
+    assert totals["data"] == {"instances": 2, "queued_items": 2}
+
+
+def test_all_warning_group_is_a_warning():
+    totals = grouped("warning", "warning")
+    assert totals["status"] == "warning"
+    assert totals["reason"] == "Not healthy: Sonarr 0, Sonarr 1"
+
+
+def test_mixed_group_is_a_warning():
+    assert grouped("healthy", "down")["status"] == "warning"
+    assert grouped("warning", "timeout", "error")["status"] == "warning"
+
+
+def test_group_with_no_instance_up_is_down():
+    assert grouped("down", "error", "timeout")["status"] == "down"
@@ -0,0 +1,62 @@
+import sqlite3
+from contextlib import closing
+
+from src.store.history import DAY, HistoryStore
+
+NOW = 1_800_000_000 // 3600 * 3600 + 1800 # Half past an hour
+
+
+def rows(store):
+    with closing(sqlite3.connect(store.path)) as db:
+        return db.execute("SELECT service, metric, ts, value FROM samples ORDER BY service, metric, ts").fetchall()
+
+
+def record(store, ts, value):
+    store.record([{"name": "Sonarr", "status": "healthy", "data": {"queued_items": value}}], ts=ts)
+
+
+def test_old_samples_are_averaged_per_hour(tmp_path):
+    store = HistoryStore(tmp_path / "history.sqlite3")
+    old = NOW - 10 * DAY - 1800 # Start of an hour
+    for i, value in enumerate((1, 2, 3, 6)):
+        record(store, old + i * 600, value)
+    record(store, NOW - 60, 9)
+
+    store.compact(raw_days=7, retention_days=90, now=NOW)
+    assert [(ts, value) for _, metric, ts, value in rows(store) if metric == "queued_items"] == [(old, 3.0), (NOW - 60, 9.0)]
+
+
+def test_second_compact_without_new_raw_rows_changes_nothing(tmp_path):
+    store = HistoryStore(tmp_path / "history.sqlite3")
+    for i in range(200):
+        record(store, NOW - 20 * DAY + i * 1300, i)
+    store.compact(raw_days=7, retention_days=90, now=NOW)
+    before = rows(store)
+
+    store.compact(raw_days=7, retention_days=90, now=NOW)
+    assert rows(store) == before
+    # Later, but still within the same hour: nothing new crossed the cutoff
+    store.compact(raw_days=7, retention_days=90, now=NOW + 1700)
+    assert rows(store) == before
+
+
+def test_only_samples_crossing_the_cutoff_are_compacted(tmp_path):
+    store = HistoryStore(tmp_path / "history.sqlite3")
+    record(store, NOW - 10 * DAY, 4)
+    store.compact(raw_days=7, retention_days=90, now=NOW)
+    compacted = rows(store)
+
+    # Two samples in one hour that ages out a day later
+    hour = (NOW - 6 * DAY) // 3600 * 3600 - 3600
+    record(store, hour + 60, 10)
+    record(store, hour + 120, 20)
+    store.compact(raw_days=7, retention_days=90, now=NOW + DAY)
+    assert rows(store) == sorted(compacted + [("Sonarr", "queued_items", hour, 15.0), ("Sonarr", "status", hour, 0.0)])
+
+
+def test_retention_drops_old_hours(tmp_path):
+    store = HistoryStore(tmp_path / "history.sqlite3")
+    record(store, NOW - 100 * DAY, 1)
+    record(store, NOW - 10 * DAY, 2)
+    store.compact(raw_days=7, retention_days=90, now=NOW)
+    assert {ts for _, _, ts, _ in rows(store)} == {(NOW - 10 * DAY) // 3600 * 3600}
@@ -0,0 +1,93 @@
+from config.schema import MonitorConfig
+from src.monitor import StatusMonitor
+
+
+def report(status, name="Sonarr", reason=None):
+    return [{"name": name, "status": status, "reason": reason}]
+
+
+def run(monitor, cfg, statuses, start=0.0, step=60.0):
+    # Feed one status per check and return the alerts of each check
+    return [monitor.observe(report(status), cfg, now=start + i * step) for i, status in enumerate(statuses)]
+
+
+def test_first_sight_is_the_baseline():
+    monitor = StatusMonitor()
+    assert monitor.observe(report("down"), MonitorConfig(), now=1) == []
+    assert monitor.states["Sonarr"].status == "down"
+
+
+def test_debounce_1_alerts_on_the_first_differing_check():
+    monitor = StatusMonitor()
+    cfg = MonitorConfig(debounce=1)
+    alerts = run(monitor, cfg, ["healthy", "down"], start=1000, step=120)
+    assert alerts[0] == []
+    [alert] = alerts[1]
+    assert (alert.kind, alert.previous, alert.status, alert.previous_for) == ("changed", "healthy", "down", "2m")
+
+
+def test_debounce_2_needs_two_consecutive_checks():
+    monitor = StatusMonitor()
+    cfg = MonitorConfig(debounce=2)
+    # A one-off blip is ignored, and the pending count restarts when the status returns
+    alerts = run(monitor, cfg, ["healthy", "down", "healthy", "down", "down"], start=1)
+    assert [len(a) for a in alerts] == [0, 0, 0, 0, 1]
+    assert alerts[4][0].status == "down"
+    assert monitor.states["Sonarr"].status == "down"
+
+
+def test_debounce_counts_the_same_new_status_only():
+    monitor = StatusMonitor()
+    cfg = MonitorConfig(debounce=2)
+    alerts = run(monitor, cfg, ["healthy", "down", "warning", "warning"], start=1)
+    assert [len(a) for a in alerts] == [0, 0, 0, 1]
+    assert (alerts[3][0].previous, alerts[3][0].status) == ("healthy", "warning")
+
+
+def test_reason_is_updated_without_an_alert():
+    monitor = StatusMonitor()
+    cfg = MonitorConfig(debounce=1)
+    monitor.observe(report("warning", reason="1 error"), cfg, now=1)
+    assert monitor.observe(report("warning", reason="2 errors"), cfg, now=2) == []
+    assert monitor.states["Sonarr"].reason == "2 errors"
+
+
+def test_flapping_mutes_alerts_then_settles_after_the_window():
+    monitor = StatusMonitor()
+    cfg = MonitorConfig(debounce=1, flap_threshold=3, flap_window=600)
+    alerts = run(monitor, cfg, ["healthy", "down", "healthy", "down"], start=1)
+    assert [[a.kind for a in check] for check in alerts] == [[], ["changed"], ["changed"], ["flapping"]]
+    assert alerts[3][0].transitions == 3
+    assert monitor.states["Sonarr"].flapping
+
+    # Changes while flapping are tracked but not alerted
+    muted = run(monitor, cfg, ["healthy", "down"], start=241)
+    assert muted == [[], []]
+    assert monitor.states["Sonarr"].status == "down"
+
+    # Still within the window of the last change: no settle yet
+    assert monitor.observe(report("down"), cfg, now=301 + 599) == []
+    # A whole window without changes: alerts resume with one "settled" alert
+    [settled] = monitor.observe(report("down"), cfg, now=301 + 601)
+    assert (settled.kind, settled.status) == ("settled", "down")
+    assert not monitor.states["Sonarr"].flapping
+
+    [changed] = monitor.observe(report("healthy"), cfg, now=2000)
+    assert changed.kind == "changed"
+
+
+def test_old_transitions_leave_the_flap_window():
+    monitor = StatusMonitor()
+    cfg = MonitorConfig(debounce=1, flap_threshold=3, flap_window=600)
+    # Changes spread out further than the window never add up to flapping
+    alerts = run(monitor, cfg, ["healthy", "down", "healthy", "down", "healthy"], start=1, step=400)
+    assert all(a.kind == "changed" for check in alerts for a in check)
+    assert not monitor.states["Sonarr"].flapping
+
+
+def test_services_dropped_from_the_report_are_forgotten():
+    monitor = StatusMonitor()
+    cfg = MonitorConfig()
+    monitor.observe(report("healthy") + report("healthy", name="Radarr"), cfg, now=1)
+    monitor.observe(report("healthy"), cfg, now=2)
+    assert set(monitor.states) == {"Sonarr"}
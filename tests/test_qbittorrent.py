@@ -0,0 +1,106 @@
+from src.api.qbittorrent import TorrentMirror
+
+
+def full_update():
+    return {
+        "rid": 1,
+        "full_update": True,
+        "torrents": {
+            "a": {"name": "A", "state": "downloading", "category": "tv", "dlspeed": 300},
+            "b": {"name": "B", "state": "pausedUP", "category": "movies", "dlspeed": 0},
+            "c": {"name": "C", "state": "stalledDL", "category": "", "dlspeed": 100},
+        },
+        "server_state": {"dl_info_speed": 10, "up_info_speed": 5},
+    }
+
+
+def categories(mirror):
+    return {cat: n for cat, n in mirror.categories.items() if n > 0}
+
+
+def test_full_update():
+    mirror = TorrentMirror()
+    mirror.apply(full_update())
+    assert mirror.rid == 1
+    assert set(mirror.torrents) == {"a", "b", "c"}
+    assert mirror.active == {"a", "c"}
+    assert categories(mirror) == {"tv": 1, "movies": 1, "Uncategorized": 1}
+    assert [t["name"] for t in mirror.top_active(3)] == ["A", "C"]
+
+
+def test_partial_changes_move_state_and_category_counts():
+    mirror = TorrentMirror()
+    mirror.apply(full_update())
+    # Deltas only carry the fields that changed
+    mirror.apply({"rid": 2, "torrents": {"a": {"state": "pausedDL"}, "b": {"category": "tv"}, "c": {"dlspeed": 900}}})
+    assert mirror.rid == 2
+    assert mirror.torrents["a"] == {"name": "A", "state": "pausedDL", "category": "tv", "dlspeed": 300}
+    assert mirror.active == {"c"}
+    assert +mirror.states == {"pausedDL": 1, "pausedUP": 1, "stalledDL": 1}
+    assert categories(mirror) == {"tv": 2, "Uncategorized": 1}
+    assert mirror.top_active(1)[0]["dlspeed"] == 900
+
+
+def test_removed_and_added_torrents():
+    mirror = TorrentMirror()
+    mirror.apply(full_update())
+    mirror.apply({"rid": 3, "torrents_removed": ["a", "unknown"],
+                  "torrents": {"d": {"name": "D", "state": "error", "category": "movies"}}})
+    assert set(mirror.torrents) == {"b", "c", "d"}
+    assert mirror.active == {"c"}
+    assert +mirror.states == {"pausedUP": 1, "stalledDL": 1, "error": 1}
+    assert categories(mirror) == {"movies": 2, "Uncategorized": 1}
+
+
+def test_server_state_is_merged_and_rid_kept_when_missing():
+    mirror = TorrentMirror()
+    mirror.apply(full_update())
+    mirror.apply({"server_state": {"dl_info_speed": 20}})
+    assert mirror.rid == 1
+    assert mirror.server_state == {"dl_info_speed": 20, "up_info_speed": 5}
+
+
+def test_full_update_resets_the_mirror():
+    mirror = TorrentMirror()
+    mirror.apply(full_update())
+    mirror.apply({"rid": 7, "full_update": True, "torrents": {"z": {"name": "Z", "state": "uploading", "category": "music"}}})
+    assert set(mirror.torrents) == {"z"}
+    assert mirror.active == {"z"}
+    assert categories(mirror) == {"music": 1}
+    assert +mirror.states == {"uploading": 1}
+
+
+def test_session_survives_idle_client_eviction():
+    import httpx
+    from config.schema import NetworkConfig, QbittorrentConfig
+    from src.api import qbittorrent
+    from src.api.httpclient import registry
+    from src.api.runtime import run_sync
+
+    requests = []
+
+    def handle(request):
+        requests.append(request.url.path.rsplit("/", 1)[-1] + "?" + request.url.query.decode())
+        if request.url.path.endswith("/auth/login"):
+            return httpx.Response(200, text="Ok.", headers={"set-cookie": "SID=s1; path=/"})
+        if "SID=s1" not in request.headers.get("cookie", ""):
+            return httpx.Response(403)
+        rid = int(request.url.params["rid"])
+        data = full_update()
+        for torrent in data["torrents"].values():
+            torrent["progress"] = 0.5
+        return httpx.Response(200, json={**data, "full_update": rid == 0, "rid": rid + 1})
+
+    async def evict_all():
+        registry.evict_idle(-1)
+
+    factory, registry.transport_factory = registry.transport_factory, lambda *args: httpx.MockTransport(handle)
+    try:
+        cfg = QbittorrentConfig(name="qBittorrent", url="http://qbittorrent.test", username="u", password="p")
+        net = NetworkConfig(timeout=5, retries=0)
+        for _ in range(3):
+            assert run_sync(qbittorrent.build_summary_async(cfg, net))["status"] == "healthy"
+            run_sync(evict_all()) # As after idle_timeout between scheduled runs
+    finally:
+        registry.transport_factory = factory
+    assert requests == ["maindata?rid=0", "login?", "maindata?rid=0", "maindata?rid=1", "maindata?rid=2"]
@@ -0,0 +1,100 @@
+import json
+import random
+import asyncio
+
+import httpx
+import pytest
+
+from src.api.stream import Collect, Count, ItemStream, iter_items
+
+DOCUMENTS = [
+    "[]",
+    "[1, 2, 3]",
+    '[-12, 4.5e3, 0.25, -1E-2, 1234567890123, true, false, null]',
+    '["a", "with \\"escaped\\" quotes", "\\u00e9\\ud83d\\ude00", "comma, colon: ] brackets }"]',
+    '[{"id": 1, "tags": ["x", "y"]}, {"id": 2, "nested": {"records": [9, 9]}}, [], {}]',
+    ' \n [ 1 ,\t{"a" : [ ] } , "s" ] \r\n',
+]
+
+def chunks(text: str, rng: random.Random):
+    cuts = sorted(rng.sample(range(1, len(text)), min(len(text) - 1, rng.randint(0, 8)))) if len(text) > 1 else []
+    return [text[a:b] for a, b in zip([0] + cuts, cuts + [len(text)])]
+
+
+def parse(parts):
+    parser = ItemStream()
+    items = []
+    for part in parts:
+        items.extend(parser.feed(part))
+    items.extend(parser.feed("", final=True))
+    return items
+
+
+def expected(doc: str):
+    return json.loads(doc)
+
+
+@pytest.mark.parametrize("doc", DOCUMENTS)
+def test_array_matches_json_loads_at_any_split(doc):
+    rng = random.Random(doc)
+    for _ in range(200):
+        assert parse(chunks(doc, rng)) == expected(doc)
+
+
+def test_every_single_split_point():
+    doc = '[{"v": -0.5, "records": [1]}, 12.5e1, "x", [1, [2]], null]'
+    for i in range(len(doc) + 1):
+        assert parse([doc[:i], doc[i:]]) == expected(doc)
+    assert parse(list(doc)) == expected(doc)
+
+
+def test_number_cut_at_chunk_boundary_is_not_yielded_early():
+    parser = ItemStream()
+    assert list(parser.feed("[1, 4.5e")) == [1]
+    assert list(parser.feed("3")) == []
+    assert list(parser.feed("]")) == [4500.0]
+    assert list(parser.feed("", final=True)) == []
+
+
+def test_object_document_is_rejected():
+    with pytest.raises(json.JSONDecodeError):
+        parse(['{"records": [1]}'])
+
+
+@pytest.mark.parametrize("doc", ["[1, 2", '[{"id": 1}, {"id"', "[", '[1, "tex', '"text"', ""])
+def test_truncated_input_raises(doc):
+    with pytest.raises(json.JSONDecodeError):
+        parse(chunks(doc, random.Random(doc)) if doc else [doc])
+
+
+def test_iter_items_handles_multibyte_characters_split_across_chunks():
+    doc = json.dumps([{"name": "Ünïcødé 🎬", "i": i} for i in range(50)], ensure_ascii=False).encode()
+    rng = random.Random(0)
+    cuts = sorted(rng.sample(range(1, len(doc)), 40))
+    parts = [doc[a:b] for a, b in zip([0] + cuts, cuts + [len(doc)])]
+
+    async def run():
+        response = httpx.Response(200, stream=httpx.ByteStream(b""), headers={"content-type": "application/json"})
+        response.stream = _Chunks(parts)
+        return [item async for item in iter_items(response)]
+
+    assert asyncio.run(run()) == json.loads(doc)
+
+
+def test_aggregators():
+    counter = Count(lambda item: item % 2 == 0)
+    collect = Collect(lambda item: item > 2, lambda item: item * 10)
+    for item in parse(["[1, 2, 3, 4]"]):
+        counter.add(item)
+        collect.add(item)
+    assert counter.result == 2
+    assert collect.result == [30, 40]
+
+
+class _Chunks(httpx.AsyncByteStream):
+    def __init__(self, parts):
+        self.parts = parts
+
+    async def __aiter__(self):
+        for part in self.parts:
+            yield part